@@ -1,43 +1,126 @@
 
+import argparse
 import asyncio
 from src.adapters.ollama_adapter import OllamaAdapter
+from src.core.config import Config
 from src.core.knowledge_graph import BiologicalKnowledgeGraph
 
-async def main(gene_list):
+async def main(gene_list, hops=None):
     # 1. Initialize
     llm_adapter = OllamaAdapter()
+    if Config.OLLAMA_WARMUP:
+        # Load the model while the databases are queried
+        llm_adapter.warmup(background=True)
     bkg = BiologicalKnowledgeGraph(llm_adapter)
     
     # 2. Add gene data
     database_results = await bkg.add_gene_data(gene_list)
 
-    # 3. Reconcile data and build graph
+    # 3. Reconcile data and build graph (the pathways are cross-referenced between databases
+    #    first and the matches handed to the LLM; they are kept in bkg.cross_references)
     reconciled_data = bkg.reconcile_and_add_pathway_data(database_results)
+    bkg.add_interaction_data(database_results)
 
-    # 4. Perform harmonization and quality control on reconciled pathways (demonstration)
-    if reconciled_data and reconciled_data.get("reconciled_pathways"):
-        pass
-
-    # 5. Run analysis on the graph
-    if bkg.graph.number_of_nodes() > 0:
-        bkg.analyze_centrality()
-        bkg.detect_communities()
+    # 4. Run analysis on the graph, or only on the input genes' k-hop neighborhood. The networkx
+    #    view is built once here and passed to every step, rather than rebuilt by each of them.
+    if bkg.store.number_of_nodes() > 0:
+        if hops is not None:
+            graph = bkg.extract_ego_subgraph(gene_list, k=hops)
+            if graph.number_of_nodes() == 0:
+                print("None of the input genes are in the graph; there is no neighborhood to analyze.")
+                return None, None, None
+        else:
+            graph = bkg.graph
+        bkg.analyze_centrality(graph=graph)
+        bkg.detect_communities(graph=graph)
+        # Enrichment reads the whole graph straight from the store
+        bkg.analyze_enrichment(graph=graph if hops is not None else None)
+        bkg.propagate()
     else:
         return None, None, None
 
-    # 6. Generate hypotheses
+    # 5. Generate hypotheses
     hypotheses = bkg.generate_hypotheses("bottleneck genes")
 
-    # 7. Generate biological insights
+    # 6. Generate biological insights
     insights_query = "Summarize the key findings from the network analysis, including central genes and community structures."
     insights = bkg.generate_biological_insights(insights_query)
 
 
-    # 8. Visualize the graph
-    fig = bkg.visualize_graph()
+    # 7. Visualize the graph
+    fig = bkg.visualize_graph(graph=graph)
 
     return hypotheses, insights, fig
 
+async def compare(gene_sets, hops=1):
+    """
+    Compares several gene lists (e.g. conditions) on one union graph: data is fetched,
+    reconciled and analyzed once for all of them instead of once per list. Every source
+    looks up every gene of the union, so each set's pathways are in the graph.
+    """
+    bkg = BiologicalKnowledgeGraph(OllamaAdapter())
+
+    union = list(dict.fromkeys(gene for genes in gene_sets.values() for gene in genes))
+    database_results = await bkg.add_gene_data(union)
+    partial = [result["source"] for result in database_results.values() if result.get("partial")]
+    if partial:
+        print(f"Warning: {', '.join(partial)} returned partial data; pathway overlap may be understated.")
+    bkg.reconcile_and_add_pathway_data(database_results)
+    bkg.add_interaction_data(database_results)
+    if bkg.store.number_of_nodes() == 0:
+        return None
+
+    results = bkg.compare_gene_sets(gene_sets, k=hops)
+    for name, metrics in results["metrics"].items():
+        print(f"{name}: {metrics['nodes']} nodes, {metrics['edges']} edges, {metrics['pathways']} pathways")
+    print(f"Pathways shared by all sets: {', '.join(results['shared_pathways']) or 'none'}")
+    for entry in results["differential_centrality"][:5]:
+        print(f"Differentially central: {entry['node']} (spread {entry['spread']:.4f})")
+    return results
+
+def parse_gene_sets(specs):
+    """Parses "NAME=GENE1,GENE2" command-line specs into {name: [genes]}."""
+    gene_sets = {}
+    for spec in specs:
+        name, _, genes = spec.partition("=")
+        genes = [gene for gene in genes.split(",") if gene]
+        if not name or not genes:
+            raise ValueError(f"Expected NAME=GENE1,GENE2, got {spec!r}")
+        gene_sets[name] = genes
+    return gene_sets
+
+def report_startup_time():
+    """Prints how long the library entry points take to import in a fresh interpreter."""
+    from src.utils.profiling import measure_import_time
+
+    for module in ("src.core.knowledge_graph", "src.adapters.ollama_adapter", "main"):
+        report = measure_import_time(module)
+        print(f"{module}: {report['wall_seconds']:.3f}s wall, {report['import_seconds']:.3f}s importing")
+        for name, seconds in report["slowest_imports"]:
+            print(f"    {name}: {seconds:.3f}s")
+
+
 if __name__ == "__main__":
-    asyncio.run(main(["TP53", "EGFR"]))
+    parser = argparse.ArgumentParser(description="Build and analyze a biological knowledge graph for a gene list.")
+    parser.add_argument("genes", nargs="*", default=["TP53", "EGFR"], help="Gene symbols to analyze")
+    parser.add_argument("--hops", type=int, default=None, help="Only analyze the input genes' k-hop neighborhood")
+    parser.add_argument("--measure-startup", action="store_true", help="Report import/startup time and exit")
+    parser.add_argument("--compare", action="append", metavar="NAME=GENE1,GENE2",
+                        help="Compare several gene sets on one shared graph (repeat per set)")
+    parser.add_argument("--serve", action="store_true", help="Run as a long-lived HTTP analysis service instead")
+    args = parser.parse_args()
+
+    if args.measure_startup:
+        report_startup_time()
+    elif args.compare:
+        try:
+            gene_sets = parse_gene_sets(args.compare)
+        except ValueError as e:
+            parser.error(f"--compare: {e}")
+        asyncio.run(compare(gene_sets, hops=args.hops if args.hops is not None else 1))
+    elif args.serve:
+        from src.service.app import run
+        run()
+    else:
+        asyncio.run(main(args.genes, hops=args.hops))
 
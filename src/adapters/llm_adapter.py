@@ -11,6 +11,10 @@ class LLMAdapter:
         """Abstract method - implement for each LLM backend"""
         raise NotImplementedError
         
+    def warmup(self, background: bool = True):
+        """Loads the model ahead of the first request; backends without a load step do nothing"""
+        return None
+
     def batch_generate(self, prompts: List[str], **kwargs) -> List[str]:
         """Batch text generation"""
         # A basic implementation could just loop over generate_text
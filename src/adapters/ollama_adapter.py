@@ -1,21 +1,53 @@
 import requests
 import json
 import re # Import re for regex
-from typing import List, Dict, Any
+import threading
+from typing import Any, Callable, Dict, List
 from .llm_adapter import LLMAdapter
 from ..core.config import Config # Import Config for max_json_retries
 
 class OllamaAdapter(LLMAdapter):
     """Ollama-specific implementation"""
-    def __init__(self, model_name="gemma3:1b", base_url="http://localhost:11434"):
+    def __init__(self, model_name="gemma3:1b", base_url="http://localhost:11434", keep_alive=None):
         super().__init__(model_name, base_url)
         self.session = requests.Session()
         self.max_json_retries = Config.MAX_JSON_RETRIES
-        
-    def _generate_raw_text(self, prompt: str, json_output: bool = False, **kwargs) -> str:
+        self.keep_alive = keep_alive if keep_alive is not None else Config.OLLAMA_KEEP_ALIVE
+        self.last_request_failed = False # Set when the last call fell back to mock data
+
+    def warmup(self, background: bool = True):
+        """
+        Loads the model into memory (a generate request without a prompt) so the first real
+        request does not pay for it. Sent with keep_alive, so the model then stays resident.
+
+        :param background: Warm up in a daemon thread and return it, so the load overlaps other work.
+        :return: The warmup thread, or whether the model loaded when run in the foreground.
+        """
+        if background:
+            thread = threading.Thread(target=self._warmup, name="ollama-warmup", daemon=True)
+            thread.start()
+            return thread
+        return self._warmup()
+
+    def _warmup(self) -> bool:
+        try:
+            # Plain requests.post: the shared session is not meant to be used from two threads
+            response = requests.post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model_name, "keep_alive": self.keep_alive}
+            )
+            response.raise_for_status()
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"Warning: Could not warm up Ollama model '{self.model_name}': {e}")
+            return False
+
+    def _generate_raw_text(self, prompt: str, json_output: bool = False, schema: Dict[str, Any] = None, **kwargs) -> str:
         """
         Internal method to generate raw text from Ollama API without JSON validation/retries.
+        If a JSON schema is given, the output is constrained to it (Ollama structured outputs).
         """
+        self.last_request_failed = False
         try:
             # Ollama's /api/generate endpoint directly handles json_output via 'format' parameter
             # If format is "json", it attempts to force JSON output
@@ -23,9 +55,12 @@ class OllamaAdapter(LLMAdapter):
                 "model": self.model_name,
                 "prompt": prompt,
                 "stream": True,
+                "keep_alive": self.keep_alive,
                 "options": kwargs.get("options", {})
             }
-            if json_output:
+            if schema is not None:
+                payload["format"] = schema
+            elif json_output:
                 payload["format"] = "json"
 
             response = self.session.post(
@@ -48,6 +83,7 @@ class OllamaAdapter(LLMAdapter):
             return "".join(full_response)
 
         except requests.exceptions.RequestException as e:
+            self.last_request_failed = True
             print("\n--- Ollama API Error ---")
             print("Could not connect to the Ollama server or the API returned an error.")
             print(f"Error details: {e}")
@@ -116,25 +152,117 @@ class OllamaAdapter(LLMAdapter):
             return f"{prompt}\n{enforcement_message}"
         return prompt
 
-    def generate_fallback_json(self) -> Dict[str, Any]:
+    def generate_fallback_json(self, error: str = "Failed to generate valid JSON response from LLM after multiple retries.") -> Dict[str, Any]:
         """
         Generates a fallback JSON response if all retries fail.
         """
         return {
-            "error": "Failed to generate valid JSON response from LLM after multiple retries.",
+            "error": error,
             "reconciled_pathways": [],
             "conflicts": [],
             "confidence_scores": {},
             "recommendations": ["Review prompt and LLM capabilities."]
         }
         
-    def generate_text(self, prompt: str, json_output: bool = False, **kwargs) -> str | Dict[str, Any]:
+    def parse_json(self, response_text: str) -> Any:
+        """
+        Parses a JSON response, falling back to extracting the JSON part. Returns None if neither parses.
+        """
+        for candidate in (response_text, self.clean_response(response_text)):
+            try:
+                return json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+        return None
+
+    def generate_structured(self, prompt: str, schema: Dict[str, Any],
+                            section_validators: Dict[str, Callable[[Any], Any]] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Generates a JSON object constrained to schema and validates it section by section.
+
+        Each top-level property of the schema is a section. A section that is missing or fails its
+        validator (which returns the normalized value or raises ValueError) is regenerated on its
+        own, constrained to just that property's schema, instead of regenerating the whole answer.
+        Sections still invalid after max_json_retries repairs are emptied and reported under
+        "validation_errors".
+        """
+        section_validators = section_validators or {}
+        properties = schema.get("properties", {})
+        sections = schema.get("required") or list(properties)
+
+        response_text = self._generate_raw_text(prompt, json_output=True, schema=schema, **kwargs)
+        if self.last_request_failed:
+            return self.generate_fallback_json("Could not reach the Ollama server for structured generation.")
+        data = self.parse_json(response_text)
+        if not isinstance(data, dict):
+            print(f"Warning: Structured response is not a JSON object:\n{response_text}")
+            data = {}
+
+        result, errors = {}, {}
+        for section in sections:
+            try:
+                result[section] = self._validate_section(data, section, section_validators)
+            except ValueError as e:
+                errors[section] = str(e)
+
+        for section in list(errors):
+            repaired, error = self._repair_section(prompt, properties.get(section, {}), section,
+                                                   errors[section], section_validators, **kwargs)
+            if error is None:
+                result[section] = repaired
+                del errors[section]
+            else:
+                errors[section] = error
+
+        for section in errors:
+            result[section] = {} if properties.get(section, {}).get("type") == "object" else []
+        result = {section: result[section] for section in sections}
+        if errors:
+            print(f"Warning: LLM response sections failed validation after repair: {errors}")
+            result["validation_errors"] = errors
+        return result
+
+    @staticmethod
+    def _validate_section(data: Dict[str, Any], section: str, section_validators: Dict[str, Callable[[Any], Any]]) -> Any:
+        if section not in data:
+            raise ValueError(f"missing required field '{section}'")
+        validator = section_validators.get(section)
+        return validator(data[section]) if validator else data[section]
+
+    def _repair_section(self, prompt: str, section_schema: Dict[str, Any], section: str, error: str,
+                        section_validators: Dict[str, Callable[[Any], Any]], **kwargs):
+        """
+        Regenerates a single invalid section. Returns (value, None) on success, (None, last error) otherwise.
+        """
+        repair_schema = {"type": "object", "properties": {section: section_schema}, "required": [section]}
+        for attempt in range(self.max_json_retries):
+            repair_prompt = (
+                f"{prompt}\n\nThe \"{section}\" field of your previous answer was invalid: {error}\n"
+                f"Return ONLY a JSON object with a single corrected \"{section}\" field."
+            )
+            response_text = self._generate_raw_text(repair_prompt, json_output=True, schema=repair_schema, **kwargs)
+            if self.last_request_failed:
+                break
+            data = self.parse_json(response_text)
+            try:
+                return self._validate_section(data if isinstance(data, dict) else {}, section, section_validators), None
+            except ValueError as e:
+                error = str(e)
+                print(f"Repair attempt {attempt + 1} for '{section}' failed: {error}")
+        return None, error
+
+    def generate_text(self, prompt: str, json_output: bool = False, schema: Dict[str, Any] = None,
+                      section_validators: Dict[str, Callable[[Any], Any]] = None, **kwargs) -> str | Dict[str, Any]:
         """
         Generates text using the Ollama API, with JSON validation and retry logic if json_output is True.
+        Passing a JSON schema switches to schema-constrained generation with per-section repair.
         """
         if not json_output:
             return self._generate_raw_text(prompt, json_output=False, **kwargs)
 
+        if schema is not None:
+            return self.generate_structured(prompt, schema, section_validators, **kwargs)
+
         # JSON generation with retry logic
         current_prompt = prompt
         for attempt in range(self.max_json_retries):
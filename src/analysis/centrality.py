@@ -20,6 +20,7 @@ def calculate_eigenvector_centrality(graph: nx.MultiDiGraph) -> dict:
     if isinstance(graph, (nx.MultiDiGraph, nx.MultiGraph)):
         # Create a DiGraph, keeping only one edge for any parallel edges
         simple_graph = nx.Graph() # Use Graph for undirected eigenvector centrality
+        simple_graph.add_nodes_from(graph)
         for u, v, k in graph.edges(keys=True):
             if not simple_graph.has_edge(u, v):
                 simple_graph.add_edge(u, v)
@@ -27,6 +28,9 @@ def calculate_eigenvector_centrality(graph: nx.MultiDiGraph) -> dict:
     else:
         graph_to_analyze = graph
 
+    if graph_to_analyze.number_of_nodes() == 0:
+        return {} # networkx raises NetworkXPointlessConcept on an empty graph
+
     try:
         # It's common to calculate eigenvector on the undirected version of the graph
         # to capture overall influence regardless of direction.
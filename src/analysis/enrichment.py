@@ -0,0 +1,179 @@
+import networkx as nx
+import numpy as np
+from scipy import sparse, stats
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from ..core.graph_store import CompactGraphStore, NodeType, Relation
+
+
+def build_membership_matrix(graph: nx.MultiDiGraph) -> Tuple[sparse.csr_matrix, List[str], List[str]]:
+    """
+    Builds a sparse gene x pathway membership matrix from the graph's "participates_in" edges.
+
+    :return: (matrix, genes, pathways) where matrix[i, j] == 1 iff genes[i] is in pathways[j].
+    """
+    genes = [node for node, node_type in graph.nodes(data="type") if node_type == "gene"]
+    pathways = [node for node, node_type in graph.nodes(data="type") if node_type == "pathway"]
+    gene_index = {gene: i for i, gene in enumerate(genes)}
+    pathway_index = {pathway: j for j, pathway in enumerate(pathways)}
+
+    rows, cols = [], []
+    for u, v, relation in graph.edges(data="relation"):
+        if relation == "participates_in" and u in gene_index and v in pathway_index:
+            rows.append(gene_index[u])
+            cols.append(pathway_index[v])
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(genes), len(pathways))
+    )
+    # Parallel edges sum up in the constructor; membership is binary.
+    matrix.data[:] = 1
+    return matrix, genes, pathways
+
+
+def build_store_membership_matrix(store: CompactGraphStore) -> Tuple[sparse.csr_matrix, List[str], List[str]]:
+    """
+    Same as build_membership_matrix, read straight from the store's edge columns so no
+    networkx view of the whole graph has to be built.
+    """
+    types = store.node_type_codes()
+    gene_rows = np.flatnonzero(types == NodeType.GENE)
+    pathway_rows = np.flatnonzero(types == NodeType.PATHWAY)
+    # Store node index -> row / column in the matrix
+    position = np.full(len(types), -1, dtype=np.int64)
+    position[gene_rows] = np.arange(len(gene_rows))
+    position[pathway_rows] = np.arange(len(pathway_rows))
+
+    src, dst, rel, _ = store.edge_arrays()
+    member = (rel == Relation.PARTICIPATES_IN) & (types[src] == NodeType.GENE) & (types[dst] == NodeType.PATHWAY)
+    matrix = sparse.csr_matrix(
+        (np.ones(int(member.sum()), dtype=np.int32), (position[src[member]], position[dst[member]])),
+        shape=(len(gene_rows), len(pathway_rows))
+    )
+    matrix.data[:] = 1
+    return matrix, [store.node_id(i) for i in gene_rows], [store.node_id(i) for i in pathway_rows]
+
+
+def build_gene_set_matrix(gene_sets: List[Iterable[str]], genes: List[str]) -> sparse.csr_matrix:
+    """Encodes a batch of gene sets as a sparse set x gene indicator matrix over the given gene order."""
+    gene_index = {gene: i for i, gene in enumerate(genes)}
+    rows, cols = [], []
+    for row, gene_set in enumerate(gene_sets):
+        for col in {gene_index[gene] for gene in gene_set if gene in gene_index}:
+            rows.append(row)
+            cols.append(col)
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(gene_sets), len(genes))
+    )
+
+
+def hypergeometric_pvalues(membership: sparse.csr_matrix, set_matrix: sparse.csr_matrix,
+                           background_size: Optional[int] = None,
+                           set_sizes: Optional[np.ndarray] = None,
+                           pathway_sizes: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes over-representation p-values for every (gene set, pathway) pair in one pass.
+
+    :param membership: gene x pathway indicator matrix.
+    :param set_matrix: set x gene indicator matrix over the same gene order.
+    :param background_size: Size of the gene universe; defaults to the genes in membership.
+    :param set_sizes: Per-set sizes to use as draws; defaults to each set's genes within the matrix.
+    :param pathway_sizes: Per-pathway sizes within the universe; defaults to each pathway's genes
+                          within the matrix. NaN marks unknown sizes, whose p-values are NaN.
+    :return: (pvalues, overlaps), both dense set x pathway arrays.
+    """
+    overlaps = (set_matrix @ membership).toarray()
+    if pathway_sizes is None:
+        pathway_sizes = np.asarray(membership.sum(axis=0)).ravel()
+    if set_sizes is None:
+        set_sizes = np.asarray(set_matrix.sum(axis=1)).ravel()
+    universe = background_size if background_size is not None else membership.shape[0]
+
+    # P(X >= k) for X ~ Hypergeom(universe, pathway size, set size), broadcast over all pairs
+    pvalues = stats.hypergeom.sf(overlaps - 1, universe, pathway_sizes[np.newaxis, :],
+                                 np.asarray(set_sizes)[:, np.newaxis])
+    pvalues = np.where(overlaps > 0, pvalues, 1.0)
+    pvalues = np.where(np.isnan(pathway_sizes)[np.newaxis, :], np.nan, pvalues)
+    return np.clip(pvalues, 0.0, 1.0), overlaps
+
+
+def benjamini_hochberg(pvalues: np.ndarray) -> np.ndarray:
+    """
+    Benjamini-Hochberg FDR, applied independently to each row of a set x pathway p-value array.
+    NaN p-values (untestable pathways) are not counted as tests and get NaN q-values.
+    """
+    pvalues = np.atleast_2d(pvalues)
+    if pvalues.shape[1] == 0:
+        return pvalues.copy()
+
+    missing = np.isnan(pvalues)
+    n_tests = (~missing).sum(axis=1, keepdims=True)
+    # NaNs sort last, so the tested p-values take ranks 1..n_tests of their row
+    order = np.argsort(pvalues, axis=1)
+    ranked = np.take_along_axis(pvalues, order, axis=1) * n_tests / np.arange(1, pvalues.shape[1] + 1)
+    # Enforce monotonicity from the largest p-value down
+    ranked = np.fmin.accumulate(ranked[:, ::-1], axis=1)[:, ::-1]
+    qvalues = np.empty_like(ranked)
+    np.put_along_axis(qvalues, order, np.minimum(ranked, 1.0), axis=1)
+    qvalues[missing] = np.nan
+    return qvalues
+
+
+def enrich_gene_sets(graph: Union[nx.MultiDiGraph, CompactGraphStore], gene_sets: List[Iterable[str]],
+                     background_size: Optional[int] = None, min_overlap: int = 1) -> List[List[Dict]]:
+    """
+    Runs pathway over-representation analysis for a batch of gene sets against the graph's pathways.
+
+    :param graph: A networkx (sub)graph, or the CompactGraphStore itself for the whole graph.
+
+    :param gene_sets: Gene sets to test, evaluated together in one vectorized pass.
+    :param background_size: Size of the gene universe (e.g. ~20000 for the human genome). When
+                            given, each set counts all its genes as draws and pathway sizes are
+                            the ones the source databases reported ("size" node attribute), since
+                            the graph only holds the members that were queried; pathways without
+                            a known size are listed with p_value/fdr None. Otherwise the universe,
+                            the draws and the pathway sizes are restricted to genes in the graph.
+    :param min_overlap: Pathways sharing fewer genes with a set are left out of its results.
+    :return: For each gene set, a list of result dicts sorted by p-value (untested pathways last).
+    """
+    gene_sets = [set(gene_set) for gene_set in gene_sets]
+    if isinstance(graph, CompactGraphStore):
+        membership, genes, pathways = build_store_membership_matrix(graph)
+        pathway_name = lambda pathway: graph.node_name(pathway) or pathway
+        reported_size = graph.node_size
+    else:
+        membership, genes, pathways = build_membership_matrix(graph)
+        pathway_name = lambda pathway: graph.nodes[pathway].get("name", pathway)
+        reported_size = lambda pathway: graph.nodes[pathway].get("size")
+    if not pathways:
+        return [[] for _ in gene_sets]
+
+    pathway_sizes = np.asarray(membership.sum(axis=0)).ravel().astype(np.float64)
+    set_sizes = None
+    if background_size is not None:
+        set_sizes = np.array([len(gene_set) for gene_set in gene_sets])
+        reported = np.array([reported_size(pathway) or np.nan for pathway in pathways], dtype=np.float64)
+        # A pathway has at least the members in the graph, even if the reported count is stale
+        pathway_sizes = np.where(np.isnan(reported), np.nan, np.fmax(reported, pathway_sizes))
+
+    set_matrix = build_gene_set_matrix(gene_sets, genes)
+    pvalues, overlaps = hypergeometric_pvalues(membership, set_matrix, background_size, set_sizes, pathway_sizes)
+    qvalues = benjamini_hochberg(pvalues)
+    optional = lambda value, cast: None if np.isnan(value) else cast(value)
+
+    results = []
+    for row in range(len(gene_sets)):
+        hits = np.flatnonzero(overlaps[row] >= max(min_overlap, 1))
+        hits = hits[np.argsort(pvalues[row, hits], kind="stable")]
+        results.append([
+            {
+                "pathway_id": pathways[j],
+                "pathway_name": pathway_name(pathways[j]),
+                "overlap": int(overlaps[row, j]),
+                "pathway_size": optional(pathway_sizes[j], int),
+                "p_value": optional(pvalues[row, j], float),
+                "fdr": optional(qvalues[row, j], float),
+            }
+            for j in hits
+        ])
+    return results
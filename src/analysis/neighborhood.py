@@ -0,0 +1,88 @@
+import numpy as np
+import networkx as nx
+from typing import Iterable, List, Optional
+
+from ..core.graph_store import CompactGraphStore
+
+
+class NeighborhoodIndex:
+    """
+    Undirected CSR adjacency over a CompactGraphStore, for k-hop neighborhood queries whose
+    cost depends on the size of the neighborhood rather than of the whole graph.
+
+    Each adjacency entry points back at its edge in the store, so edge weights (STRING scores)
+    can be thresholded at query time and induced subgraphs built without scanning all edges.
+    """
+    def __init__(self, store: CompactGraphStore):
+        self.store = store
+        self.version = store.version
+        src, dst, _, weight = store.edge_arrays()
+        n_nodes = store.number_of_nodes()
+
+        # Every edge is listed under both endpoints
+        rows = np.concatenate([src, dst])
+        cols = np.concatenate([dst, src])
+        edge_ids = np.tile(np.arange(len(src), dtype=np.int64), 2)
+
+        order = np.argsort(rows, kind="stable")
+        self.indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_nodes), out=self.indptr[1:])
+        self.indices = cols[order]
+        self.edge_ids = edge_ids[order]
+        self.weights = weight
+
+    def is_stale(self) -> bool:
+        return self.version != self.store.version
+
+    def _adjacent(self, nodes: np.ndarray, min_score: Optional[float]):
+        """Returns (neighbor index, edge id) for every edge incident to nodes that passes min_score."""
+        starts = self.indptr[nodes]
+        lengths = self.indptr[nodes + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        # Concatenated CSR row slices without a Python loop
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        positions = offsets + np.arange(total)
+        neighbors = self.indices[positions]
+        edge_ids = self.edge_ids[positions]
+        if min_score is not None:
+            # Unweighted edges (NaN, e.g. pathway membership) always pass
+            passes = ~(self.weights[edge_ids] < min_score)
+            neighbors, edge_ids = neighbors[passes], edge_ids[passes]
+        return neighbors, edge_ids
+
+    def k_hop_nodes(self, seeds: Iterable[int], k: int = 1, min_score: Optional[float] = None) -> np.ndarray:
+        """
+        Returns the sorted indices of all nodes within k hops of the seed node indices.
+
+        :param min_score: Weighted edges scoring below this are not followed.
+        """
+        visited = np.unique(np.fromiter(seeds, dtype=np.int64))
+        frontier = visited
+        for _ in range(k):
+            if len(frontier) == 0:
+                break
+            neighbors, _ = self._adjacent(frontier, min_score)
+            frontier = np.setdiff1d(neighbors, visited)
+            visited = np.union1d(visited, frontier)
+        return visited
+
+    def induced_edge_ids(self, nodes: np.ndarray, min_score: Optional[float] = None) -> np.ndarray:
+        """Returns the store edge ids of all edges with both endpoints in nodes (sorted indices)."""
+        neighbors, edge_ids = self._adjacent(nodes, min_score)
+        return np.unique(edge_ids[np.isin(neighbors, nodes)])
+
+    def ego_subgraph(self, seeds: Iterable[str], k: int = 1, min_score: Optional[float] = None) -> nx.MultiDiGraph:
+        """
+        Materializes the k-hop ego subgraph around the seed node IDs as a networkx graph.
+        Seeds that are not in the graph are ignored.
+        """
+        seed_indices = [self.store.node_index(seed) for seed in seeds if self.store.has_node(seed)]
+        nodes = self.k_hop_nodes(seed_indices, k, min_score)
+        return self.store.subgraph(nodes, self.induced_edge_ids(nodes, min_score))
+
+
+def ego_subgraph(store: CompactGraphStore, seeds: List[str], k: int = 1, min_score: Optional[float] = None) -> nx.MultiDiGraph:
+    """One-off ego subgraph extraction; build a NeighborhoodIndex instead for repeated queries."""
+    return NeighborhoodIndex(store).ego_subgraph(seeds, k, min_score)
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Dict, Any
 from ..core.database_connector import DatabaseConnector
 from ..legacy_connectors.database_connectors import LegacyKEGGConnector, APIClient
@@ -10,13 +11,18 @@ class KEGGConnector(DatabaseConnector):
     async def fetch_genes(self, gene_list: List[str]) -> Dict:
         # Assuming gene_list contains UniProt IDs for now
         # In a real scenario, you'd map gene_list to UniProt IDs if necessary
-        # For simplicity, we'll fetch pathways for the first gene in the list
         if not gene_list:
             return {}
-        uniprot_id_for_query = gene_list[0] # This is a simplification
-
-        pathways = await self.legacy_kegg_connector.get_kegg_pathways(uniprot_id_for_query)
-        return {"source": self.name, "genes": gene_list, "pathways": pathways}
+        # Every gene is looked up; a pathway hit by several genes is listed once with all of them
+        pathways = {}
+        for gene_id in gene_list:
+            for pathway in await self.legacy_kegg_connector.get_kegg_pathways(gene_id):
+                pathways.setdefault(pathway["id"], {**pathway, "genes": []})["genes"].append(gene_id)
+        # Full pathway sizes, so enrichment doesn't have to count members among the queried genes only
+        sizes = await asyncio.gather(*(self.legacy_kegg_connector.get_kegg_pathway_size(pathway_id) for pathway_id in pathways))
+        for pathway, size in zip(pathways.values(), sizes):
+            pathway["size"] = size
+        return {"source": self.name, "genes": gene_list, "pathways": list(pathways.values())}
 
     def parse_response(self, response: Any) -> Dict:
         # The fetch_genes method already returns a structured dict
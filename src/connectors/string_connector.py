@@ -3,6 +3,8 @@ from typing import List, Dict, Any
 from ..core.database_connector import DatabaseConnector
 from ..legacy_connectors.database_connectors import LegacyStringConnector, APIClient
 
+INTERACTION_FIELDS = ("preferredName_A", "preferredName_B", "score")
+
 class StringConnector(DatabaseConnector):
     def __init__(self, api_client: APIClient):
         super().__init__("STRING", api_client)
@@ -12,7 +14,13 @@ class StringConnector(DatabaseConnector):
         if not gene_list:
             return {}
         
-        interactions = await self.legacy_string_connector.get_string_interactions(gene_list)
+        # Streamed, keeping only the fields add_interaction_data uses, so the full
+        # response (a dozen scores per interaction) is never held in memory
+        interactions = [
+            {field: interaction.get(field) for field in INTERACTION_FIELDS}
+            async for interaction in self.legacy_string_connector.iter_string_interactions(gene_list)
+            if isinstance(interaction, dict)
+        ]
         return {"source": self.name, "genes": gene_list, "interactions": interactions}
 
     def parse_response(self, response: Any) -> Dict:
@@ -1,7 +1,8 @@
-
 class Config:
     OLLAMA_BASE_URL = "http://localhost:11434"
     DEFAULT_MODEL = "llama2"
+    OLLAMA_KEEP_ALIVE = "30m" # How long Ollama keeps the model loaded after the last request
+    OLLAMA_WARMUP = True # Load the model in the background at startup, while data is being fetched
     CACHE_DIR = "./cache"
     RATE_LIMITS = {
         'kegg': 1.0,  # seconds between requests
@@ -9,3 +10,40 @@ class Config:
         'reactome': 1.0
     }
     MAX_JSON_RETRIES = 3 # Max retries for LLM to produce valid JSON
+    ENRICHMENT_MAX_FDR = 0.05 # Pathways above this FDR are not reported as enriched
+    # Size of the gene universe for enrichment (roughly all human protein-coding genes). The graph only
+    # holds the input genes' own pathways, so using its genes as the universe could never be significant.
+    ENRICHMENT_BACKGROUND_SIZE = 20000
+    PROPAGATION_RESTART_PROB = 0.5 # Restart probability of the random walk used for network propagation
+    EXPORT_CHUNK_SIZE = 100_000 # Rows per chunk when exporting result tables
+
+    # Tail-latency control for upstream databases
+    SOURCE_DEADLINES = {
+        'kegg': 20.0,  # seconds a source fetch may take before it is abandoned, for a single gene
+        'reactome': 20.0,
+        'uniprot': 15.0,
+        'string': 10.0
+    }
+    DEFAULT_SOURCE_DEADLINE = 20.0
+    # Extra seconds per additional gene, so large gene lists (and service batches) are not cut off
+    SOURCE_DEADLINE_PER_GENE = {
+        'kegg': 2.0,
+        'reactome': 2.0,
+        'uniprot': 2.0,
+        'string': 0.05
+    }
+    REQUEST_TIMEOUT = 8.0 # Per-attempt timeout for a single HTTP GET
+    HTTP_MAX_RETRIES = 2 # Extra attempts after the first one fails
+    RETRY_BACKOFF_BASE = 0.25 # seconds, doubled on every attempt
+    RETRY_BACKOFF_MAX = 4.0
+    HEDGE_DELAY = 1.5 # Send a duplicate GET if the first hasn't answered by then (None disables hedging)
+    CIRCUIT_FAILURE_THRESHOLD = 3 # Consecutive failures before a source is skipped
+    CIRCUIT_RESET_TIMEOUT = 60.0 # seconds before a skipped source is probed again
+
+    # Analysis service (python -m src.service)
+    SERVICE_HOST = "127.0.0.1"
+    SERVICE_PORT = 8080
+    SERVICE_BATCH_WINDOW = 0.5 # seconds to wait for more jobs before a batch is fetched and analyzed
+    SERVICE_MAX_BATCH_SIZE = 32
+    SERVICE_DEFAULT_HOPS = 1 # Each job is analyzed on its genes' k-hop neighborhood of the shared graph
+    SERVICE_MAX_FINISHED_JOBS = 1000 # Oldest finished jobs are forgotten beyond this
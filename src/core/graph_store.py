@@ -0,0 +1,320 @@
+import math
+import sys
+import weakref
+from array import array
+from enum import IntEnum
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import networkx as nx
+import numpy as np
+
+
+class NodeType(IntEnum):
+    UNKNOWN = 0
+    GENE = 1
+    PATHWAY = 2
+    PROTEIN = 3
+
+
+class Relation(IntEnum):
+    PARTICIPATES_IN = 1 # gene -> pathway
+    INTERACTS_WITH = 2 # gene <-> gene (e.g. STRING), stored once per unordered pair
+
+
+UNDIRECTED_RELATIONS = frozenset({Relation.INTERACTS_WITH})
+
+# Bit layout of the deduplication key: | source id | target id | relation |
+_RELATION_BITS = 4
+_NODE_BITS = 29
+
+
+def count_edges(graph: Union["CompactGraphStore", nx.MultiDiGraph]) -> int:
+    """
+    Edge count of the store or a networkx view of it, counting undirected relations once
+    (the views list them in both directions), so both forms report the same number.
+    """
+    if isinstance(graph, CompactGraphStore):
+        return graph.number_of_edges()
+    undirected = {relation.name.lower() for relation in UNDIRECTED_RELATIONS}
+    mirrored = sum(1 for _, _, relation in graph.edges(data="relation") if relation in undirected)
+    return graph.number_of_edges() - mirrored // 2
+
+
+def _coerce(enum_cls, value):
+    """Accepts an enum member or its (case-insensitive) name, e.g. "participates_in"."""
+    if isinstance(value, enum_cls):
+        return value
+    try:
+        return enum_cls[str(value).upper()]
+    except KeyError:
+        raise ValueError(f"Unknown {enum_cls.__name__} '{value}'. Expected one of {[m.name.lower() for m in enum_cls]}.")
+
+
+class CompactGraphStore:
+    """
+    Memory-compact store for the knowledge graph.
+
+    Node IDs are interned to dense integers, node types and relations are small enum codes,
+    and edges live in parallel typed arrays (source, target, relation, weight) rather than
+    per-edge attribute dicts. Adding the same (source, target, relation) edge again updates
+    its weight instead of creating a parallel edge; duplicates are folded lazily, in one
+    vectorized pass, the next time edges are read.
+
+    Analysis and visualization code written against networkx uses as_networkx(), a frozen
+    MultiDiGraph view. The store only keeps a weak reference to it: callers running several
+    analyses should build it once and pass it along, since it is rebuilt whenever the previous
+    one has been released (or the store has changed).
+    """
+    def __init__(self):
+        self._node_index: Dict[str, int] = {}
+        self._node_ids: List[str] = []
+        self._node_types = array('b')
+        self._node_names: Dict[int, str] = {} # Display names, only for nodes that have one
+        self._node_sizes: Dict[int, int] = {} # Member gene counts reported by the source, pathways only
+
+        # Deduplicated, key-sorted edges ...
+        self._src = np.empty(0, dtype=np.int32)
+        self._dst = np.empty(0, dtype=np.int32)
+        self._rel = np.empty(0, dtype=np.int8)
+        self._weight = np.empty(0, dtype=np.float32)
+        # ... and edges appended since the last compaction
+        self._pending_src = array('i')
+        self._pending_dst = array('i')
+        self._pending_rel = array('b')
+        self._pending_weight = array('f')
+
+        self._version = 0 # Bumped on every mutation, used to invalidate derived views
+        self._nx_view = None # Weak reference, so the view only lives as long as someone uses it
+        self._nx_view_version = -1
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph) -> "CompactGraphStore":
+        """Loads a networkx graph whose nodes/edges use the "type", "name", "size", "relation" and "weight" attributes."""
+        store = cls()
+        for node, data in graph.nodes(data=True):
+            store.add_node(node, data.get("type", NodeType.UNKNOWN), data.get("name"), data.get("size"))
+        for u, v, data in graph.edges(data=True):
+            store.add_edge(u, v, data.get("relation", Relation.PARTICIPATES_IN), data.get("weight"))
+        return store
+
+    # --- Nodes ---
+
+    def add_node(self, node_id: str, node_type: Union[NodeType, str] = NodeType.UNKNOWN, name: Optional[str] = None,
+                 size: Optional[int] = None) -> int:
+        """
+        Adds a node (or updates its type/name/size if it exists) and returns its integer index.
+
+        :param size: For pathways, the number of genes the source database lists as members
+                     (most of which are usually not in the graph).
+        """
+        node_type = _coerce(NodeType, node_type)
+        index = self._node_index.get(node_id)
+        if index is None:
+            if len(self._node_ids) >= 1 << _NODE_BITS:
+                raise OverflowError("CompactGraphStore supports at most 2**29 nodes.")
+            index = len(self._node_ids)
+            node_id = sys.intern(node_id) if isinstance(node_id, str) else node_id
+            self._node_index[node_id] = index
+            self._node_ids.append(node_id)
+            self._node_types.append(node_type)
+            changed = True
+        else:
+            # Re-adding an existing node unchanged must not invalidate derived views
+            changed = node_type != NodeType.UNKNOWN and self._node_types[index] != node_type
+            if changed:
+                self._node_types[index] = node_type
+        if name is not None and self._node_names.get(index) != name:
+            self._node_names[index] = name
+            changed = True
+        if size is not None and self._node_sizes.get(index) != size:
+            self._node_sizes[index] = int(size)
+            changed = True
+        if changed:
+            self._version += 1
+        return index
+
+    def has_node(self, node_id: str) -> bool:
+        return node_id in self._node_index
+
+    def node_index(self, node_id: str) -> int:
+        return self._node_index[node_id]
+
+    def node_id(self, index: int) -> str:
+        return self._node_ids[index]
+
+    def node_type(self, node_id: str) -> NodeType:
+        return NodeType(self._node_types[self._node_index[node_id]])
+
+    def node_name(self, node_id: str) -> Optional[str]:
+        return self._node_names.get(self._node_index[node_id])
+
+    def node_size(self, node_id: str) -> Optional[int]:
+        return self._node_sizes.get(self._node_index[node_id])
+
+    def nodes(self, node_type: Union[NodeType, str, None] = None) -> List[str]:
+        """Returns node IDs, optionally restricted to one node type."""
+        if node_type is None:
+            return list(self._node_ids)
+        code = _coerce(NodeType, node_type)
+        return [node for node, t in zip(self._node_ids, self._node_types) if t == code]
+
+    def node_type_codes(self) -> np.ndarray:
+        return np.frombuffer(self._node_types, dtype=np.int8).copy()
+
+    def number_of_nodes(self) -> int:
+        return len(self._node_ids)
+
+    @property
+    def version(self) -> int:
+        """Changes whenever the store is mutated."""
+        return self._version
+
+    # --- Edges ---
+
+    def add_edge(self, u: str, v: str, relation: Union[Relation, str] = Relation.PARTICIPATES_IN,
+                 weight: Optional[float] = None) -> None:
+        """
+        Adds an edge, creating untyped endpoint nodes as needed. Re-adding an existing
+        (u, v, relation) edge overwrites its weight rather than creating a parallel edge.
+        """
+        relation = _coerce(Relation, relation)
+        src = self._node_index.get(u)
+        if src is None:
+            src = self.add_node(u)
+        dst = self._node_index.get(v)
+        if dst is None:
+            dst = self.add_node(v)
+        if relation in UNDIRECTED_RELATIONS and dst < src:
+            src, dst = dst, src
+        self._pending_src.append(src)
+        self._pending_dst.append(dst)
+        self._pending_rel.append(relation)
+        self._pending_weight.append(math.nan if weight is None else weight)
+        self._version += 1
+
+    def add_edges(self, sources: Iterable[str], targets: Iterable[str], relation: Union[Relation, str],
+                  weights: Optional[Iterable[float]] = None) -> None:
+        """Bulk version of add_edge for edges sharing one relation, appended as whole columns."""
+        relation = _coerce(Relation, relation)
+        index = self._node_index
+        src = np.array([index[u] if u in index else self.add_node(u) for u in sources], dtype=np.int32)
+        dst = np.array([index[v] if v in index else self.add_node(v) for v in targets], dtype=np.int32)
+        if len(src) != len(dst):
+            raise ValueError("sources and targets must have the same length.")
+        if weights is None:
+            weight = np.full(len(src), np.nan, dtype=np.float32)
+        else:
+            weight = np.array([math.nan if w is None else w for w in weights], dtype=np.float32)
+        if relation in UNDIRECTED_RELATIONS:
+            src, dst = np.minimum(src, dst), np.maximum(src, dst)
+
+        self._pending_src.frombytes(src.tobytes())
+        self._pending_dst.frombytes(dst.tobytes())
+        self._pending_rel.frombytes(np.full(len(src), relation, dtype=np.int8).tobytes())
+        self._pending_weight.frombytes(weight.tobytes())
+        self._version += 1
+
+    def number_of_edges(self) -> int:
+        self._compact()
+        return len(self._src)
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the deduplicated (source index, target index, relation code, weight) columns.
+        Weights are NaN where no weight was given. The arrays must not be modified.
+        """
+        self._compact()
+        return self._src, self._dst, self._rel, self._weight
+
+    def edges(self) -> Iterator[Tuple[str, str, Relation, Optional[float]]]:
+        """Yields (source ID, target ID, relation, weight or None) for every edge."""
+        src, dst, rel, weight = self.edge_arrays()
+        ids = self._node_ids
+        for s, d, r, w in zip(src.tolist(), dst.tolist(), rel.tolist(), weight.tolist()):
+            yield ids[s], ids[d], Relation(r), None if math.isnan(w) else w
+
+    def _compact(self) -> None:
+        """Folds pending edges into the sorted edge arrays, keeping the last weight of duplicates."""
+        if not self._pending_src:
+            return
+        src = np.concatenate([self._src, np.frombuffer(self._pending_src, dtype=np.int32)])
+        dst = np.concatenate([self._dst, np.frombuffer(self._pending_dst, dtype=np.int32)])
+        rel = np.concatenate([self._rel, np.frombuffer(self._pending_rel, dtype=np.int8)])
+        weight = np.concatenate([self._weight, np.frombuffer(self._pending_weight, dtype=np.float32)])
+
+        keys = ((src.astype(np.int64) << (_NODE_BITS + _RELATION_BITS))
+                | (dst.astype(np.int64) << _RELATION_BITS) | rel.astype(np.int64))
+        # np.unique keeps the first occurrence, so search the reversed keys to keep the latest edge
+        _, last = np.unique(keys[::-1], return_index=True)
+        keep = len(keys) - 1 - last
+
+        self._src, self._dst, self._rel, self._weight = src[keep], dst[keep], rel[keep], weight[keep]
+        self._pending_src = array('i')
+        self._pending_dst = array('i')
+        self._pending_rel = array('b')
+        self._pending_weight = array('f')
+
+    # --- Views ---
+
+    def as_networkx(self) -> nx.MultiDiGraph:
+        """
+        Returns a frozen MultiDiGraph with "type"/"name"/"size" node attributes and "relation"/"weight"
+        edge attributes, matching the layout the analysis and visualization code expects.
+        The view is shared while it is in use and the store is unchanged, but it is not kept
+        alive by the store, so the graph is not held in both forms between analyses.
+        """
+        view = self._nx_view() if self._nx_view is not None else None
+        if view is None or self._nx_view_version != self._version:
+            view = nx.freeze(self.subgraph(range(self.number_of_nodes())))
+            self._nx_view = weakref.ref(view)
+            self._nx_view_version = self._version
+        return view
+
+    def subgraph(self, node_indices: Iterable[int], edge_ids: Optional[np.ndarray] = None) -> nx.MultiDiGraph:
+        """
+        Materializes the networkx subgraph induced by the given node indices.
+        Undirected relations (stored once per pair) are emitted in both directions, so that
+        directed algorithms such as closeness and betweenness don't depend on node order.
+
+        :param edge_ids: Positions in edge_arrays() of the edges to include. When given (e.g. by
+                         a NeighborhoodIndex), the induced edges don't have to be searched for.
+        """
+        node_indices = np.unique(np.fromiter(node_indices, dtype=np.int64))
+        graph = nx.MultiDiGraph()
+        type_names = {t: t.name.lower() for t in NodeType}
+        for index in node_indices.tolist():
+            attrs = {"type": type_names[self._node_types[index]]}
+            if index in self._node_names:
+                attrs["name"] = self._node_names[index]
+            if index in self._node_sizes:
+                attrs["size"] = self._node_sizes[index]
+            graph.add_node(self._node_ids[index], **attrs)
+
+        src, dst, rel, weight = self.edge_arrays()
+        if edge_ids is not None:
+            src, dst, rel, weight = src[edge_ids], dst[edge_ids], rel[edge_ids], weight[edge_ids]
+        elif len(node_indices) < self.number_of_nodes():
+            selected = np.isin(src, node_indices) & np.isin(dst, node_indices)
+            src, dst, rel, weight = src[selected], dst[selected], rel[selected], weight[selected]
+
+        undirected = np.isin(rel, [int(r) for r in UNDIRECTED_RELATIONS])
+        src, dst = np.concatenate([src, dst[undirected]]), np.concatenate([dst, src[undirected]])
+        rel, weight = np.concatenate([rel, rel[undirected]]), np.concatenate([weight, weight[undirected]])
+
+        relation_names = {r: r.name.lower() for r in Relation}
+        ids = self._node_ids
+        graph.add_edges_from(
+            (ids[s], ids[d], {"relation": relation_names[r]} if math.isnan(w) else {"relation": relation_names[r], "weight": w})
+            for s, d, r, w in zip(src.tolist(), dst.tolist(), rel.tolist(), weight.tolist())
+        )
+        return graph
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Approximate bytes held by the node and edge columns (excluding the networkx view)."""
+        self._compact()
+        edge_bytes = self._src.nbytes + self._dst.nbytes + self._rel.nbytes + self._weight.nbytes
+        node_bytes = (sys.getsizeof(self._node_index) + sys.getsizeof(self._node_ids)
+                      + sum(sys.getsizeof(node) for node in self._node_ids)
+                      + self._node_types.buffer_info()[1] * self._node_types.itemsize
+                      + sys.getsizeof(self._node_names) + sys.getsizeof(self._node_sizes))
+        return {"nodes": node_bytes, "edges": edge_bytes, "total": node_bytes + edge_bytes}
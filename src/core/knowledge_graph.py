@@ -3,35 +3,97 @@ import networkx as nx
 import asyncio
 import json
 from ..adapters.llm_adapter import LLMAdapter
+from .config import Config
+from .graph_store import CompactGraphStore, NodeType, Relation, count_edges
+from .reconciliation import RECONCILIATION_SCHEMA, RECONCILIATION_VALIDATORS
 from ..analysis import centrality, community
-from ..utils import visualization
-from ..connectors.kegg_connector import KEGGConnector
-from ..connectors.reactome_connector import ReactomeConnector
-from ..connectors.uniprot_connector import UniProtConnector
-from ..connectors.string_connector import StringConnector # New import for STRING
-from ..legacy_connectors.database_connectors import APIClient # Import APIClient
-from ..legacy_connectors.data_harmonization import DataHarmonizer # Import DataHarmonizer
-from ..legacy_connectors.quality_control import QualityControl # Import QualityControl
+from ..utils.resilience import CircuitBreaker, request_errors
+# Connectors, the harmonizer, QC and visualization pull in aiohttp, reactome2py, mygene and
+# matplotlib. They are imported on first use so runs that never touch them don't pay for it.
+
+DATABASE_NAMES = ('kegg', 'reactome', 'uniprot', 'string')
 
 
 class BiologicalKnowledgeGraph:
     def __init__(self, llm_adapter: LLMAdapter):
-        self.graph = nx.MultiDiGraph()
+        self.store = CompactGraphStore()
         self.llm = llm_adapter
         self.centrality_scores = {}
         self.communities = []
-        self.harmonizer = DataHarmonizer() # Instantiate DataHarmonizer
-        self.qc = QualityControl() # Instantiate QualityControl
-        
-        # Initialize APIClient once and pass to all connectors
-        self.api_client = APIClient() 
-        self.databases = {
-            'kegg': KEGGConnector(self.api_client),
-            'reactome': ReactomeConnector(self.api_client),
-            'uniprot': UniProtConnector(self.api_client),
-            'string': StringConnector(self.api_client) # Add STRING connector
+        self.input_genes = []
+        self.enrichment_results = []
+        self.pathway_sizes = {} # Pathway ID -> member gene count reported by its source database
+        self.cross_references = {} # Deterministic cross-database pathway matches of the last reconciliation
+        self.analysis_graph = None # Subgraph the last centrality analysis ran on (None: whole graph)
+        self.propagation_scores = None # Random-walk-with-restart scores of the input genes, by node index
+        self.propagation_version = None # Store version the propagation scores were computed on
+        self.comparison_results = None
+        self._transition_cache = None
+        self._neighborhood_index = None
+        self._harmonizer = None
+        self._qc = None
+        self._api_client = None
+        self._databases = None
+        # Breakers outlive a single add_gene_data call so a degraded source stays skipped
+        self.circuit_breakers = {
+            name: CircuitBreaker(name, Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_RESET_TIMEOUT)
+            for name in DATABASE_NAMES
         }
 
+    @property
+    def graph(self) -> nx.MultiDiGraph:
+        """
+        Read-only networkx view of the compact store. Each access may rebuild it (see
+        CompactGraphStore.as_networkx), so keep the returned graph and pass it to the analysis
+        methods rather than reading this property repeatedly. Mutate the graph through self.store.
+        """
+        return self.store.as_networkx()
+
+    @graph.setter
+    def graph(self, graph: nx.Graph):
+        self.store = CompactGraphStore.from_networkx(graph)
+
+    @property
+    def harmonizer(self):
+        if self._harmonizer is None:
+            from ..legacy_connectors.data_harmonization import DataHarmonizer
+            self._harmonizer = DataHarmonizer()
+        return self._harmonizer
+
+    @property
+    def qc(self):
+        if self._qc is None:
+            from ..legacy_connectors.quality_control import QualityControl
+            self._qc = QualityControl()
+        return self._qc
+
+    @property
+    def api_client(self):
+        # Initialize APIClient once and pass to all connectors
+        if self._api_client is None:
+            from ..legacy_connectors.database_connectors import APIClient
+            self._api_client = APIClient()
+        return self._api_client
+
+    @property
+    def databases(self) -> Dict:
+        if self._databases is None:
+            from ..connectors.kegg_connector import KEGGConnector
+            from ..connectors.reactome_connector import ReactomeConnector
+            from ..connectors.uniprot_connector import UniProtConnector
+            from ..connectors.string_connector import StringConnector
+            self._databases = {
+                'kegg': KEGGConnector(self.api_client),
+                'reactome': ReactomeConnector(self.api_client),
+                'uniprot': UniProtConnector(self.api_client),
+                'string': StringConnector(self.api_client)
+            }
+        return self._databases
+
+    @databases.setter
+    def databases(self, databases: Dict):
+        self._databases = databases
+
     async def __aenter__(self):
         # Ensure APIClient's session is managed
         await self.api_client.__aenter__()
@@ -40,13 +102,23 @@ class BiologicalKnowledgeGraph:
     async def __aexit__(self, exc_type, exc, tb):
         await self.api_client.__aexit__(exc_type, exc, tb)
 
-    async def add_gene_data(self, gene_list: List[str]):
+    async def add_gene_data(self, gene_list: List[str], source_genes: Dict[str, List[str]] = None):
         """
         Fetches data from multiple databases in parallel for a list of genes.
+        Each source runs under its own deadline and circuit breaker, so one slow or failing
+        database yields a result marked "partial" instead of stalling the whole gather.
+
+        :param source_genes: Per-database gene lists used instead of gene_list, e.g. to query
+                             STRING (whose network only links the genes it is given) with more genes.
         """
+        self.input_genes = list(gene_list)
+        source_genes = source_genes or {}
         # Ensure APIClient's session is active for this context
         async with self.api_client:
-            tasks = [db.fetch_genes(gene_list) for db in self.databases.values()]
+            tasks = [
+                self._fetch_source(name, db, source_genes.get(name, gene_list))
+                for name, db in self.databases.items()
+            ]
             database_raw_results = await asyncio.gather(*tasks)
             
             processed_results = {}
@@ -54,18 +126,78 @@ class BiologicalKnowledgeGraph:
                 if result and "source" in result:
                     processed_results[result["source"].lower()] = result
 
+            for result in processed_results.values():
+                for pathway in result.get("pathways") or []:
+                    if pathway.get("id") and pathway.get("size"):
+                        self.pathway_sizes[pathway["id"]] = pathway["size"]
             return processed_results
 
+    async def _fetch_source(self, name: str, db, gene_list: List[str]) -> Dict:
+        """
+        Fetches one database under its deadline (scaled with the number of genes),
+        recording the outcome on its circuit breaker.
+        """
+        breaker = self.circuit_breakers[name]
+        if not breaker.allow_request():
+            print(f"Skipping {db.name}: circuit open after {breaker.failures} consecutive failures.")
+            return {"source": db.name, "genes": gene_list, "partial": True, "errors": ["circuit open"]}
+
+        deadline = Config.SOURCE_DEADLINES.get(name, Config.DEFAULT_SOURCE_DEADLINE)
+        deadline += Config.SOURCE_DEADLINE_PER_GENE.get(name, 0.0) * max(len(gene_list) - 1, 0)
+        errors = []
+        token = request_errors.set(errors)
+        try:
+            result = await asyncio.wait_for(db.fetch_genes(gene_list), timeout=deadline)
+        except asyncio.TimeoutError:
+            errors.append(f"deadline of {deadline}s exceeded")
+            result = {"source": db.name, "genes": gene_list}
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            result = {"source": db.name, "genes": gene_list}
+        finally:
+            request_errors.reset(token)
+
+        if errors:
+            breaker.record_failure()
+            print(f"Warning: {db.name} returned partial data: {errors}")
+            result = dict(result or {"source": db.name, "genes": gene_list})
+            result["partial"] = True
+            result["errors"] = errors
+        else:
+            breaker.record_success()
+        return result
+
     def reconcile_and_add_pathway_data(self, database_results: Dict):
         """
         Uses an LLM to reconcile pathway data from multiple sources and adds it to the graph.
         """
+        reconciled_data = self.reconcile_pathway_data(database_results)
+        if reconciled_data is not None:
+            self.add_pathway_data(reconciled_data)
+        return reconciled_data
+
+    def reconcile_pathway_data(self, database_results: Dict):
+        """
+        Uses an LLM to reconcile pathway data from multiple sources, without touching the graph.
+        The deterministic cross-references (see cross_reference_pathways) are computed first and
+        given to the model, so it starts from the matches and conflicts that are already known.
+
+        :return: The validated reconciliation, or None if the LLM gave no usable answer.
+        """
+        cross_references = [
+            {key: entry[key] for key in ("name", "ids", "sources", "categories", "confidence", "conflicts")}
+            for entry in self.cross_reference_pathways(database_results).values()
+        ]
         prompt = f"""
         You are a JSON API that processes biological pathway data. 
 
         INPUT DATA:
         {json.dumps(database_results, indent=2)}
 
+        CROSS-REFERENCES (pathways already matched between databases by ID or normalized name;
+        confidence is the fraction of databases reporting the pathway):
+        {json.dumps(cross_references, indent=2)}
+
         IMPORTANT: Return ONLY valid JSON. No explanations, no code, no markdown.
 
         OUTPUT FORMAT:
@@ -93,44 +225,115 @@ class BiologicalKnowledgeGraph:
 
         TASK: Process the input data and return JSON only.
         """
-        reconciled_data = self.llm.generate_text(prompt, json_output=True)
+        reconciled_data = self.llm.generate_text(
+            prompt, json_output=True, schema=RECONCILIATION_SCHEMA, section_validators=RECONCILIATION_VALIDATORS
+        )
         
         if isinstance(reconciled_data, dict) and not reconciled_data.get("error"):
-            # Now, add the reconciled data to the graph
-            for pathway in reconciled_data.get("reconciled_pathways", []):
-                pathway_id = pathway.get("pathway_id")
-                pathway_name = pathway.get("pathway_name", "Unknown Pathway")
-                self.graph.add_node(pathway_id, name=pathway_name, type="pathway")
-                for gene in pathway.get("genes", []):
-                    self.graph.add_node(gene, type="gene")
-                    self.graph.add_edge(gene, pathway_id, relation="participates_in")
-
             return reconciled_data
+        return None
 
-        else:
-            return None
+    def add_pathway_data(self, reconciled_data: Dict) -> None:
+        """
+        Adds the pathways of a reconciliation (see reconcile_pathway_data) to the graph, with the
+        pathway sizes the databases reported in add_gene_data.
+        """
+        for pathway in reconciled_data.get("reconciled_pathways", []):
+            pathway_id = pathway.get("pathway_id")
+            if not pathway_id:
+                continue
+            pathway_name = pathway.get("pathway_name", "Unknown Pathway")
+            self.store.add_node(pathway_id, NodeType.PATHWAY, name=pathway_name, size=self.pathway_sizes.get(pathway_id))
+            for gene in pathway.get("genes", []):
+                self.store.add_node(gene, NodeType.GENE)
+                self.store.add_edge(gene, pathway_id, Relation.PARTICIPATES_IN)
         
-    def generate_biological_insights(self, query: str) -> str:
+    def cross_reference_pathways(self, database_results: Dict) -> Dict[str, Dict]:
         """
-        Uses the LLM to analyze the network and generate insights based on a query.
+        Deterministically matches pathways reported by the different databases, without an LLM call.
+
+        :param database_results: The output of add_gene_data.
+        :return: match key -> cross-referenced pathway with sources, confidence and conflict flags,
+                 also kept in self.cross_references.
         """
-        if not self.centrality_scores or not self.communities:
-            return "Analysis has not been run. Please run analysis first."
+        records = [
+            {"id": pathway.get("id"), "name": pathway["name"], "source": result.get("source", name)}
+            for name, result in database_results.items()
+            for pathway in (result or {}).get("pathways") or []
+            if pathway.get("name")
+        ]
+        self.cross_references = self.qc.cross_reference_pathways(self.harmonizer.standardize_pathway_names(records))
+        return self.cross_references
 
-        # Create a summary of the analysis results to use in the prompt
-        prompt_context = f"Here is a summary of a biological network analysis:\n"
-        prompt_context += f"- The network has {self.graph.number_of_nodes()} nodes and {self.graph.number_of_edges()} edges.\n"
-        
-        prompt_context += "\n--- Top 5 Most Central Nodes (by Degree) ---\n"
+    def add_interaction_data(self, database_results: Dict, min_score: float = 0.0) -> int:
+        """
+        Adds STRING protein-protein interactions to the graph as weighted gene-gene edges.
+
+        :param database_results: The output of add_gene_data.
+        :param min_score: Interactions with a lower STRING combined score are skipped.
+        :return: The number of interactions added.
+        """
+        interactions = (database_results.get("string") or {}).get("interactions") or []
+        added = 0
+        for interaction in interactions:
+            gene_a = interaction.get("preferredName_A")
+            gene_b = interaction.get("preferredName_B")
+            score = interaction.get("score")
+            if not gene_a or not gene_b or (score is not None and score < min_score):
+                continue
+            self.store.add_node(gene_a, NodeType.GENE)
+            self.store.add_node(gene_b, NodeType.GENE)
+            self.store.add_edge(gene_a, gene_b, Relation.INTERACTS_WITH, weight=score)
+            added += 1
+        return added
+
+    def _analysis_summary(self) -> str:
+        """
+        Summary of the current analysis results that every LLM prompt starts with.
+        Keeping it byte-identical across the follow-up calls lets Ollama reuse the cached
+        prompt prefix instead of re-ingesting it, as long as the model stays loaded.
+        """
+        summary = "Here is a summary of a biological network analysis:\n"
+        analyzed = self.analysis_graph if self.analysis_graph is not None else self.store
+        summary += f"- The network has {analyzed.number_of_nodes()} nodes and {count_edges(analyzed)} edges.\n"
+
+        summary += "\n--- Top 5 Most Central Nodes (by Degree) ---\n"
         for node, score in self.get_top_n_central_nodes('degree', n=5):
-            prompt_context += f"- {node}: {score:.4f}\n"
+            summary += f"- {node}: {score:.4f}\n"
 
-        prompt_context += "\n--- Detected Communities ---\n"
+        summary += "\n--- Top 5 Potential Bottlenecks (by Betweenness Centrality) ---\n"
+        for node, score in self.get_top_n_central_nodes('betweenness', n=5):
+            summary += f"- {node}: {score:.4f}\n"
+
+        summary += "\n--- Detected Communities ---\n"
         for i, community_nodes in enumerate(self.communities):
-            prompt_context += f"- Community {i+1}: {', '.join(map(str, community_nodes))}\n"
+            summary += f"- Community {i+1}: {', '.join(map(str, community_nodes))}\n"
+
+        enriched = self.get_top_enriched_pathways(n=5)
+        if enriched:
+            summary += "\n--- Enriched Pathways (hypergeometric test, BH-adjusted) ---\n"
+            for result in enriched:
+                summary += (
+                    f"- {result['pathway_name']} ({result['pathway_id']}): {result['overlap']}/{result['pathway_size']} genes, "
+                    f"FDR {result['fdr']:.2e}\n"
+                )
+
+        candidates = self.get_top_propagated_genes(n=5)
+        if candidates:
+            summary += "\n--- Genes Closest to the Input Set by Network Propagation (random walk with restart) ---\n"
+            for gene, score in candidates:
+                summary += f"- {gene}: {score:.4f}\n"
+        return summary
+
+    def generate_biological_insights(self, query: str) -> str:
+        """
+        Uses the LLM to analyze the network and generate insights based on a query.
+        """
+        if not self.centrality_scores or not self.communities:
+            return "Analysis has not been run. Please run analysis first."
 
-        # Combine with the user's query
-        full_prompt = f"{prompt_context}\nBased on this analysis, please answer the following question: {query}"
+        # The query goes after the shared summary so the prompt prefix can be reused
+        full_prompt = f"{self._analysis_summary()}\nBased on this analysis, please answer the following question: {query}"
 
         # Call the LLM to generate insights
         insights = self.llm.generate_text(full_prompt)
@@ -144,34 +347,55 @@ class BiologicalKnowledgeGraph:
         if not self.centrality_scores:
             return "Analysis has not been run. Please run analysis first."
 
-        prompt_context = ""
+        question = f"Based on this analysis, please generate 3-5 testable hypotheses about {topic} in the context of the network.\n"
         if topic == "bottleneck genes":
-            prompt_context = "The following genes have been identified as potential bottlenecks in the network due to their high betweenness centrality:\n"
-            bottlenecks = self.get_top_n_central_nodes('betweenness', n=n_bottlenecks)
-            for node, score in bottlenecks:
-                prompt_context += f"- {node} (Betweenness Centrality: {score:.4f})\n"
-        
-        full_prompt = f"""
-        {prompt_context}
-        Based on this information, please generate 3-5 testable hypotheses about the biological role of these potential bottleneck genes in the context of the network.
-        Provide a brief explanation for each hypothesis.
-        """
+            bottlenecks = [str(node) for node, _ in self.get_top_n_central_nodes('betweenness', n=n_bottlenecks)]
+            question = (
+                f"The genes {', '.join(bottlenecks)} have been identified as potential bottlenecks in the network "
+                "due to their high betweenness centrality.\n"
+                "Based on this analysis, please generate 3-5 testable hypotheses about the biological role of "
+                "these potential bottleneck genes in the context of the network.\n"
+            )
+        full_prompt = f"{self._analysis_summary()}\n{question}Provide a brief explanation for each hypothesis."
 
         hypotheses = self.llm.generate_text(full_prompt)
         return hypotheses
 
-    def analyze_centrality(self, use_cache: bool = True) -> None:
+    @property
+    def neighborhood_index(self):
+        """k-hop neighborhood index over the store, rebuilt only after the store changes."""
+        if self._neighborhood_index is None or self._neighborhood_index.is_stale():
+            from ..analysis.neighborhood import NeighborhoodIndex
+            self._neighborhood_index = NeighborhoodIndex(self.store)
+        return self._neighborhood_index
+
+    def extract_ego_subgraph(self, seeds: List[str] = None, k: int = 1, min_score: float = None) -> nx.MultiDiGraph:
+        """
+        Extracts the k-hop neighborhood around a seed gene set, for focused analyses.
+
+        :param seeds: Seed node IDs; defaults to the genes passed to add_gene_data.
+        :param k: Number of hops to expand.
+        :param min_score: STRING interactions scoring below this are neither followed nor included.
+        :return: A networkx subgraph that analyze_centrality, detect_communities,
+                 analyze_enrichment, export_results and visualize_graph accept via their graph argument.
+        """
+        seeds = seeds if seeds is not None else self.input_genes
+        return self.neighborhood_index.ego_subgraph(seeds, k, min_score)
+
+    def analyze_centrality(self, use_cache: bool = True, graph: nx.MultiDiGraph = None) -> None:
         """
-        Performs a full centrality analysis on the graph and stores the results.
+        Performs a full centrality analysis on the graph (or the given subgraph) and stores the results.
         Uses a simple in-memory cache to avoid re-calculation.
         """
-        if use_cache and self.centrality_scores:
+        if use_cache and self.centrality_scores and graph is self.analysis_graph:
             return
 
-        self.centrality_scores['degree'] = centrality.calculate_degree_centrality(self.graph)
-        self.centrality_scores['betweenness'] = centrality.calculate_betweenness_centrality(self.graph)
-        self.centrality_scores['closeness'] = centrality.calculate_closeness_centrality(self.graph)
-        self.centrality_scores['eigenvector'] = centrality.calculate_eigenvector_centrality(self.graph)
+        self.analysis_graph = graph
+        graph = graph if graph is not None else self.graph
+        self.centrality_scores['degree'] = centrality.calculate_degree_centrality(graph)
+        self.centrality_scores['betweenness'] = centrality.calculate_betweenness_centrality(graph)
+        self.centrality_scores['closeness'] = centrality.calculate_closeness_centrality(graph)
+        self.centrality_scores['eigenvector'] = centrality.calculate_eigenvector_centrality(graph)
 
     def get_top_n_central_nodes(self, centrality_type: str, n: int = 10) -> List[tuple]:
         """
@@ -188,18 +412,135 @@ class BiologicalKnowledgeGraph:
         sorted_nodes = sorted(scores.items(), key=lambda item: item[1], reverse=True)
         return sorted_nodes[:n]
 
-    def detect_communities(self) -> None:
+    def analyze_enrichment(self, gene_list: List[str] = None, background_size: int = Config.ENRICHMENT_BACKGROUND_SIZE,
+                           graph: nx.MultiDiGraph = None) -> List[Dict]:
         """
-        Detects communities in the graph using the Louvain method and stores the result.
+        Tests the input genes for pathway over-representation and stores the results.
+
+        :param gene_list: Genes to test; defaults to the genes passed to add_gene_data.
+        :param background_size: Size of the gene universe (Config.ENRICHMENT_BACKGROUND_SIZE);
+                                None restricts it to the genes in the graph.
+        :param graph: Subgraph whose pathways are tested; defaults to the whole graph.
+        :return: Result dicts sorted by p-value.
+        """
+        from ..analysis import enrichment # scipy is only needed here
+
+        gene_list = gene_list if gene_list is not None else self.input_genes
+        graph = graph if graph is not None else self.store
+        self.enrichment_results = enrichment.enrich_gene_sets(graph, [gene_list], background_size)[0]
+        return self.enrichment_results
+
+    def get_top_enriched_pathways(self, n: int = 10, max_fdr: float = Config.ENRICHMENT_MAX_FDR) -> List[Dict]:
+        """
+        Gets the N most significantly enriched pathways from the last enrichment analysis.
+        Pathways that could not be tested (unknown size, fdr None) are never reported.
+        """
+        return [result for result in self.enrichment_results
+                if result["fdr"] is not None and result["fdr"] <= max_fdr][:n]
+
+    def propagate(self, gene_sets: List[List[str]] = None, restart_prob: float = Config.PROPAGATION_RESTART_PROB,
+                  min_score: float = None):
+        """
+        Scores every node's network proximity to one or many gene sets by random walk with restart.
+        All gene sets are propagated together in one sparse iteration.
+
+        :param gene_sets: Gene sets to propagate; defaults to the input genes, whose scores are stored.
+        :param restart_prob: Probability of restarting at the seeds at each step.
+        :param min_score: STRING interactions scoring below this are ignored.
+        :return: An n_nodes x n_sets array of visiting probabilities, rows in store node order.
         """
-        self.communities = community.detect_louvain_communities(self.graph)
+        from ..analysis import propagation # scipy is only needed here
 
-    def visualize_graph(self):
+        # The transition matrix only depends on the graph, so batches of gene sets share it
+        cache_key = (self.store.version, min_score)
+        if self._transition_cache is None or self._transition_cache[0] != cache_key:
+            transition = propagation.transition_matrix(propagation.adjacency_matrix(self.store, min_score))
+            self._transition_cache = (cache_key, transition)
+        transition, dangling = self._transition_cache[1]
+
+        store_input = gene_sets is None
+        gene_sets = [self.input_genes] if store_input else gene_sets
+        scores = propagation.random_walk_with_restart(
+            transition, dangling, propagation.seed_matrix(self.store, gene_sets), restart_prob
+        )
+        if store_input:
+            self.propagation_scores = scores[:, 0]
+            self.propagation_version = self.store.version
+        return scores
+
+    def get_top_propagated_genes(self, n: int = 10) -> List[tuple]:
         """
-        Generates and displays a visualization of the graph.
+        Gets the N genes closest to the input genes by network propagation, excluding the input genes.
+
+        :return: A list of (gene, score) tuples.
         """
-        if not self.graph:
+        # Scores from before the last change to the graph are stale
+        if self.propagation_scores is None or self.propagation_version != self.store.version:
+            return []
+
+        from ..analysis import propagation
+        return propagation.top_candidates(self.store, self.propagation_scores, self.input_genes, n)
+
+    def compare_gene_sets(self, gene_sets: Dict[str, List[str]], k: int = 1, min_score: float = None,
+                          top_n: int = 10) -> Dict:
+        """
+        Compares several gene sets (e.g. conditions) on the current graph, which should already
+        hold the union of their data, instead of building and analyzing a graph per set.
+
+        Nodes and edges carry per-set membership bitmasks, from which per-set subgraph metrics,
+        differential degree centrality and pathway / node overlap (Jaccard) are computed in one
+        vectorized pass. All sets are also propagated together by random walk with restart.
+
+        :param gene_sets: Set name -> genes (at most 64 sets).
+        :param k: Each set's subgraph is its genes' k-hop neighborhood.
+        :param min_score: STRING interactions scoring below this are ignored.
+        :param top_n: Number of differentially central nodes and propagated genes to report.
+        :return: The result of analysis.comparison.compare_gene_sets plus "propagated_genes" per set.
+        """
+        from ..analysis import comparison, propagation
+
+        results = comparison.compare_gene_sets(self.neighborhood_index, gene_sets, k, min_score, top_n)
+        scores = self.propagate(list(gene_sets.values()), min_score=min_score)
+        results["propagated_genes"] = {
+            name: propagation.top_candidates(self.store, scores[:, column], gene_sets[name], top_n)
+            for column, name in enumerate(gene_sets)
+        }
+        self.comparison_results = results
+        return results
+
+    def detect_communities(self, graph: nx.MultiDiGraph = None) -> None:
+        """
+        Detects communities in the graph (or the given subgraph) using the Louvain method and stores the result.
+        """
+        self.communities = community.detect_louvain_communities(graph if graph is not None else self.graph)
+
+    def export_results(self, path: str, export_format: str = "hdf5", chunk_size: int = Config.EXPORT_CHUNK_SIZE,
+                       graph: nx.MultiDiGraph = None) -> List[str]:
+        """
+        Exports nodes, edges, centrality scores and community assignments as columnar tables.
+
+        :param path: Output file (hdf5) or directory (parquet, arrow).
+        :param export_format: One of 'hdf5', 'parquet', 'arrow'.
+        :param chunk_size: Rows per written chunk / row group.
+        :param graph: Subgraph to export; defaults to the whole graph, read from the store's columns.
+        :return: The paths written.
+        """
+        from ..utils import export
+
+        if graph is None:
+            tables = export.store_result_tables(self.store, self.centrality_scores, self.communities)
+        else:
+            tables = export.result_tables(graph, self.centrality_scores, self.communities)
+        return export.export_tables(tables, path, export_format, chunk_size)
+
+    def visualize_graph(self, graph: nx.MultiDiGraph = None):
+        """
+        Generates and displays a visualization of the graph (or the given subgraph).
+        """
+        graph = graph if graph is not None else self.graph
+        if not graph.number_of_nodes():
             return
-            
+
+        from ..utils import visualization
         centrality_for_sizing = self.centrality_scores.get('degree', {})
-        return visualization.draw_graph(self.graph, self.communities, centrality_for_sizing)
\ No newline at end of file
+        return visualization.draw_graph(graph, self.communities, centrality_for_sizing)
\ No newline at end of file
@@ -0,0 +1,141 @@
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List
+
+
+def _string(value: Any, name: str) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"'{name}' must be a non-empty string, got {value!r}")
+    return value.strip()
+
+
+def _string_list(value: Any, name: str) -> List[str]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        raise ValueError(f"'{name}' must be an array of strings, got {value!r}")
+    return [_string(item, f"{name}[{i}]") for i, item in enumerate(value)]
+
+
+def _confidence(value: Any, name: str) -> float:
+    try:
+        confidence = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be a number between 0 and 1, got {value!r}")
+    if not 0.0 <= confidence <= 1.0:
+        raise ValueError(f"'{name}' must be between 0 and 1, got {confidence}")
+    return confidence
+
+
+def _object(value: Any, name: str) -> Dict:
+    if not isinstance(value, dict):
+        raise ValueError(f"'{name}' must be an object, got {value!r}")
+    return value
+
+
+@dataclass
+class ReconciledPathway:
+    pathway_id: str
+    pathway_name: str
+    genes: List[str]
+    source_databases: List[str] = field(default_factory=list)
+    confidence: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Any, name: str = "pathway") -> "ReconciledPathway":
+        data = _object(data, name)
+        return cls(
+            pathway_id=_string(data.get("pathway_id"), f"{name}.pathway_id"),
+            pathway_name=_string(data.get("pathway_name"), f"{name}.pathway_name"),
+            genes=_string_list(data.get("genes"), f"{name}.genes"),
+            source_databases=_string_list(data.get("source_databases", []), f"{name}.source_databases"),
+            confidence=_confidence(data.get("confidence"), f"{name}.confidence"),
+        )
+
+
+@dataclass
+class PathwayConflict:
+    pathway_id: str
+    issue: str
+    databases: List[str] = field(default_factory=list)
+    resolution: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Any, name: str = "conflict") -> "PathwayConflict":
+        data = _object(data, name)
+        return cls(
+            pathway_id=_string(data.get("pathway_id"), f"{name}.pathway_id"),
+            issue=_string(data.get("issue"), f"{name}.issue"),
+            databases=_string_list(data.get("databases", []), f"{name}.databases"),
+            resolution=str(data.get("resolution") or ""),
+        )
+
+
+def _validate_pathways(value: Any) -> List[Dict]:
+    if not isinstance(value, list):
+        raise ValueError(f"'reconciled_pathways' must be an array, got {value!r}")
+    return [asdict(ReconciledPathway.from_dict(item, f"reconciled_pathways[{i}]")) for i, item in enumerate(value)]
+
+
+def _validate_conflicts(value: Any) -> List[Dict]:
+    if not isinstance(value, list):
+        raise ValueError(f"'conflicts' must be an array, got {value!r}")
+    return [asdict(PathwayConflict.from_dict(item, f"conflicts[{i}]")) for i, item in enumerate(value)]
+
+
+def _validate_confidence_scores(value: Any) -> Dict[str, float]:
+    value = _object(value, "confidence_scores")
+    return {str(key): _confidence(score, f"confidence_scores.{key}") for key, score in value.items()}
+
+
+def _validate_recommendations(value: Any) -> List[str]:
+    return _string_list(value, "recommendations")
+
+
+_STRING_ARRAY = {"type": "array", "items": {"type": "string"}}
+
+# JSON schema handed to the model as a structured-output constraint
+RECONCILIATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "reconciled_pathways": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "pathway_id": {"type": "string"},
+                    "pathway_name": {"type": "string"},
+                    "genes": _STRING_ARRAY,
+                    "source_databases": _STRING_ARRAY,
+                    "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+                },
+                "required": ["pathway_id", "pathway_name", "genes", "source_databases", "confidence"],
+            },
+        },
+        "conflicts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "pathway_id": {"type": "string"},
+                    "issue": {"type": "string"},
+                    "databases": _STRING_ARRAY,
+                    "resolution": {"type": "string"},
+                },
+                "required": ["pathway_id", "issue", "databases", "resolution"],
+            },
+        },
+        "confidence_scores": {"type": "object", "additionalProperties": {"type": "number"}},
+        "recommendations": _STRING_ARRAY,
+    },
+    "required": ["reconciled_pathways", "conflicts", "confidence_scores", "recommendations"],
+}
+
+# Top-level section -> validator returning the normalized section or raising ValueError
+RECONCILIATION_VALIDATORS: Dict[str, Callable[[Any], Any]] = {
+    "reconciled_pathways": _validate_pathways,
+    "conflicts": _validate_conflicts,
+    "confidence_scores": _validate_confidence_scores,
+    "recommendations": _validate_recommendations,
+}
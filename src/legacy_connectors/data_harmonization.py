@@ -1,10 +1,17 @@
+from .pathway_normalizer import get_default_normalizer
 
-import pandas as pd
-import mygene
 
 class DataHarmonizer:
     def __init__(self):
-        self.mg = mygene.MyGeneInfo()
+        self._mg = None
+
+    @property
+    def mg(self):
+        # mygene (and the pandas it brings along) is only needed for ID mapping
+        if self._mg is None:
+            import mygene
+            self._mg = mygene.MyGeneInfo()
+        return self._mg
 
     def map_gene_ids(self, gene_ids, scopes="entrezgene,ensembl.gene", species="human"):
         if not isinstance(gene_ids, list):
@@ -13,35 +20,20 @@ class DataHarmonizer:
         return results
 
     def standardize_pathway_names(self, pathways):
-        # A simple example of a synonym map
-        synonym_map = {
-            "cell cycle": "Cell Cycle",
-            "metabolism": "Metabolism",
-            "dna replication": "DNA Replication",
-        }
-
-        standardized_pathways = []
-        for pathway in pathways:
-            name = pathway["name"].lower()
-            standardized_name = synonym_map.get(name, pathway["name"])
-            standardized_pathways.append({"id": pathway["id"], "name": standardized_name, "source": pathway.get("source")})
-        return standardized_pathways
+        # Synonyms are precompiled once in the shared normalizer
+        normalizer = get_default_normalizer()
+        return [
+            {"id": pathway["id"], "name": normalizer.standard_name(pathway["name"]), "source": pathway.get("source")}
+            for pathway in pathways
+        ]
 
     def create_unified_ontology(self, pathways):
-        # A simple example of an ontology mapping
-        ontology_map = {
-            "Metabolism": ["metabolism", "metabolic"],
-            "Signaling": ["signaling", "signal"],
-            "Cell Cycle": ["cell cycle", "cycle"],
-            "DNA Replication": ["dna replication", "replication"],
-        }
-
-        unified_ontology = {category: [] for category in ontology_map}
+        # One automaton scan per pathway, whatever the number of categories and keywords
+        normalizer = get_default_normalizer()
+        unified_ontology = {category: [] for category in normalizer.ontology_keywords}
 
         for pathway in pathways:
-            name = pathway["name"].lower()
-            for category, keywords in ontology_map.items():
-                if any(keyword in name for keyword in keywords):
-                    unified_ontology[category].append(pathway)
+            for category in normalizer.classify(pathway["name"]):
+                unified_ontology[category].append(pathway)
 
         return unified_ontology
@@ -1,45 +1,197 @@
 import asyncio
 import aiohttp
-import pickle
+import contextlib
+import hashlib
 import os
-from pyprojroot import here
-from lxml import etree
-import reactome2py
-from reactome2py.analysis import identifier
-import functools # Import functools
-import json # Ensure json is imported for json.loads in _get
+import tempfile
+from typing import Optional
+from ..core.config import Config
+from ..utils.resilience import backoff_delay, record_request_error
+from ..utils.streaming import decode_body, make_decoder
+
+STREAM_CHUNK_SIZE = 64 * 1024
+# Cache entries hold the raw response body, which is already its most compact serialized form
+CACHE_SUFFIXES = {"json": ".json", "xml": ".xml", "text": ".txt"}
 
 
 class APIClient:
-    """Handles low-level HTTP requests, caching, and rate limiting."""
-    def __init__(self, cache_dir=here("cache"), rate_limit: float = 0.1):
-        self.cache_dir = cache_dir
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
+    """Handles low-level HTTP requests, caching, rate limiting, retries and request hedging."""
+    def __init__(self, cache_dir: Optional[str] = None, rate_limit: float = 0.1,
+                 request_timeout: float = Config.REQUEST_TIMEOUT,
+                 max_retries: int = Config.HTTP_MAX_RETRIES,
+                 hedge_delay: Optional[float] = Config.HEDGE_DELAY):
+        self._cache_dir = cache_dir
+        self._cache_dir_ready = False
         self.session = None
+        self._session_users = 0
         self.rate_limit = rate_limit
         self._last_request_time = 0
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.hedge_delay = hedge_delay
+
+    @property
+    def cache_dir(self) -> str:
+        # Resolved and created on first use rather than at construction time
+        if not self._cache_dir_ready:
+            if self._cache_dir is None:
+                from pyprojroot import here
+                self._cache_dir = str(here("cache"))
+            os.makedirs(self._cache_dir, exist_ok=True)
+            self._cache_dir_ready = True
+        return self._cache_dir
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # Re-entrant: nested contexts share one session (and its connection pool),
+        # which the outermost context closes
+        if self._session_users == 0:
+            self.session = aiohttp.ClientSession()
+        self._session_users += 1
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        if self.session:
+        self._session_users -= 1
+        if self._session_users == 0 and self.session:
             await self.session.close()
 
-    async def _get(self, url, params=None, headers=None, response_format="json"):
+    async def _get(self, url, params=None, headers=None, response_format="json", hedge: bool = True):
         if isinstance(params, str):
             url = f"{url}?{params}"
             params = None
 
-        cache_key = str(url) + str(params) + str(headers) + response_format
-        cache_file = os.path.join(self.cache_dir, f"{hash(cache_key)}.pkl")
-
+        cache_file = self._cache_path(url, params, headers, response_format)
         if os.path.exists(cache_file):
-            with open(cache_file, "rb") as f:
-                return pickle.load(f)
+            try:
+                return self._read_cache(cache_file, response_format)
+            except (OSError, ValueError, SyntaxError) as e:
+                self._discard_cache_entry(cache_file, e)
+
+        try:
+            return await self._get_with_retries(url, params, headers, response_format, hedge, cache_file)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, SyntaxError) as e:
+            error = f"Error fetching {url}: {type(e).__name__}: {e}"
+            print(error)
+            # Rejected requests (e.g. an unknown gene symbol) say nothing about the source's health
+            if self._is_source_failure(e):
+                record_request_error(error)
+            return None
 
+    async def stream(self, url, params=None, headers=None, response_format="json", tag=None, hedge: bool = True):
+        """
+        Yields the elements of a JSON array body (or the XML elements matching tag) as they are
+        decoded, without ever materializing the whole payload. The raw body is written through
+        to the cache on the way. Non-array bodies are yielded as a single item.
+
+        Failures are retried (and slow responses hedged) like in _get as long as nothing has been
+        yielded yet; after that, or once retries run out, the stream ends early and the error is
+        recorded for the source.
+        """
+        if isinstance(params, str):
+            url = f"{url}?{params}"
+            params = None
+
+        cache_file = self._cache_path(url, params, headers, response_format)
+        if os.path.exists(cache_file):
+            yielded = False
+            try:
+                decoder = make_decoder(response_format, tag)
+                for chunk in self._iter_file_chunks(cache_file):
+                    for item in decoder.feed(chunk):
+                        yielded = True
+                        yield item
+                for item in decoder.close():
+                    yield item
+                return
+            except (OSError, ValueError, SyntaxError) as e:
+                self._discard_cache_entry(cache_file, e)
+                if yielded:
+                    return # Items are out already; the next call refetches
+
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.request_timeout, sock_read=self.request_timeout)
+        for attempt in range(self.max_retries + 1):
+            yielded = False
+            try:
+                if hedge and self.hedge_delay is not None:
+                    response = await self._hedged(lambda: self._open(url, params, headers, timeout),
+                                                  discard=lambda response: response.release())
+                else:
+                    response = await self._open(url, params, headers, timeout)
+                decoder = make_decoder(response_format, tag)
+                async with response:
+                    with self._cache_writer(cache_file) as sink:
+                        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                            sink.write(chunk)
+                            for item in decoder.feed(chunk):
+                                yielded = True
+                                yield item
+                        for item in decoder.close():
+                            yield item
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, SyntaxError) as e:
+                if not yielded and attempt < self.max_retries and self._is_source_failure(e):
+                    await asyncio.sleep(backoff_delay(attempt, Config.RETRY_BACKOFF_BASE, Config.RETRY_BACKOFF_MAX))
+                    continue
+                error = f"Error streaming {url}: {type(e).__name__}: {e}"
+                print(error)
+                if self._is_source_failure(e):
+                    record_request_error(error)
+                return
+
+    async def _open(self, url, params, headers, timeout):
+        """Sends a GET and returns the response once its headers are in; the body is left unread."""
+        await self._throttle()
+        response = await self.session.get(url, params=params, headers=headers, timeout=timeout)
+        try:
+            response.raise_for_status()
+        except aiohttp.ClientResponseError:
+            response.release()
+            raise
+        return response
+
+    def _cache_path(self, url, params, headers, response_format) -> str:
+        # A stable digest, unlike hash(), so cache entries survive interpreter restarts
+        cache_key = str(url) + str(params) + str(headers) + response_format
+        digest = hashlib.sha1(cache_key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}{CACHE_SUFFIXES.get(response_format, '.bin')}")
+
+    @staticmethod
+    def _discard_cache_entry(cache_file, error: Exception):
+        """Drops an unreadable cache entry so the request goes to the network again."""
+        print(f"Discarding unreadable cache entry {cache_file}: {type(error).__name__}: {error}")
+        with contextlib.suppress(OSError):
+            os.remove(cache_file)
+
+    def _read_cache(self, cache_file, response_format):
+        with open(cache_file, "rb") as f:
+            return decode_body(f.read(), response_format)
+
+    @staticmethod
+    def _iter_file_chunks(path):
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    @contextlib.contextmanager
+    def _cache_writer(self, cache_file):
+        """
+        Writes a response body to a temporary file that only replaces the cache entry once the
+        whole body has been received, so cancelled or failed downloads never leave partial entries.
+        Decode the body inside the block, so bodies that fail to decode are not cached either.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as sink:
+                yield sink
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    async def _throttle(self):
         # Apply rate limiting
         current_time = asyncio.get_event_loop().time()
         time_since_last_request = current_time - self._last_request_time
@@ -47,30 +199,81 @@ class APIClient:
             await asyncio.sleep(self.rate_limit - time_since_last_request)
         self._last_request_time = asyncio.get_event_loop().time()
 
+    async def _get_with_retries(self, url, params, headers, response_format, hedge, cache_file):
+        """Retries transient failures with jittered exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                if hedge and self.hedge_delay is not None:
+                    return await self._hedged(lambda: self._fetch(url, params, headers, response_format, cache_file))
+                return await self._fetch(url, params, headers, response_format, cache_file)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries or not self._is_retryable(e):
+                    raise
+                await asyncio.sleep(backoff_delay(attempt, Config.RETRY_BACKOFF_BASE, Config.RETRY_BACKOFF_MAX))
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        # Client errors (bad identifiers, malformed queries) won't succeed on a retry,
+        # except for rate limiting.
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status == 429 or error.status >= 500
+        return True
+
+    @classmethod
+    def _is_source_failure(cls, error: Exception) -> bool:
+        """Transport errors, timeouts, 5xx and 429 degrade a source; 4xx and undecodable bodies don't."""
+        if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError)):
+            return cls._is_retryable(error)
+        return False
+
+    async def _hedged(self, make_attempt, discard=None):
+        """
+        Runs make_attempt() and, if it hasn't finished within hedge_delay, a duplicate of it.
+        The first successful attempt wins and the other one is cancelled (or, if it succeeded
+        too, handed to discard). Only safe for idempotent requests, which is all this client sends.
+        """
+        tasks = [asyncio.ensure_future(make_attempt())]
+        winner = None
         try:
-            async with self.session.get(url, params=params, headers=headers) as response:
-                response.raise_for_status() # Raise an exception for HTTP errors
-                if response_format == "json":
-                    try:
-                        data = await response.json()
-                    except aiohttp.ContentTypeError:
-                        text_content = await response.text()
-                        data = json.loads(text_content)
-                elif response_format == "xml":
-                    data = etree.fromstring(await response.read())
-                elif response_format == "text":
-                    data = await response.text()
-                else:
-                    data = await response.read() # raw bytes
-
-                with open(cache_file, "wb") as f:
-                    pickle.dump(data, f)
-
-                return data
-        except aiohttp.ClientError as e:
-            print(f"Error fetching {url}: {e}")
-            return None
-
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if not done:
+                tasks.append(asyncio.ensure_future(make_attempt()))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif task is not winner and discard is not None and not task.cancelled() and task.exception() is None:
+                    discard(task.result())
+
+    async def _fetch(self, url, params, headers, response_format, cache_file):
+        """
+        A single GET attempt, bounded by request_timeout. The body is written through to the
+        cache while it arrives and decoded in one go, since the caller wants the whole value;
+        use stream() to process large array bodies element by element instead.
+        """
+        await self._throttle()
+
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        async with self.session.get(url, params=params, headers=headers, timeout=timeout) as response:
+            response.raise_for_status() # Raise an exception for HTTP errors
+            chunks = []
+            with self._cache_writer(cache_file) as sink:
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    sink.write(chunk)
+                    chunks.append(chunk)
+                # Decoded before the entry is committed: an undecodable body (e.g. an HTML error page) isn't cached
+                return decode_body(b"".join(chunks), response_format)
 
 class LegacyDatabaseConnector:
     """Base class for legacy database-specific API logic using an APIClient."""
@@ -125,12 +328,21 @@ class LegacyKEGGConnector(LegacyDatabaseConnector):
 
         return pathways
 
+    async def get_kegg_pathway_size(self, pathway_id: str):
+        """Number of human genes KEGG lists in a pathway (e.g. "hsa04110"), or None if unavailable."""
+        link_data = await self.api_client._get(f"{self.base_url}/link/hsa/{pathway_id}", response_format="text")
+        if not link_data:
+            return None
+        genes = {line.split('\t')[1] for line in link_data.strip().split('\n') if '\t' in line}
+        return len(genes) or None
+
 
 class LegacyReactomeConnector(LegacyDatabaseConnector):
     def __init__(self, api_client: APIClient):
         super().__init__(api_client)
 
     async def get_reactome_pathways(self, uniprot_id: str):
+        from reactome2py.analysis import identifier # Heavy import, deferred until first use
         loop = asyncio.get_event_loop()
         analysis_result = await loop.run_in_executor(
             None,
@@ -150,16 +362,34 @@ class LegacyReactomeConnector(LegacyDatabaseConnector):
                      pathways.append({"id": pathway_hit["stId"], "name": pathway_hit["displayName"]})
         return pathways
 
+    async def get_reactome_pathway_size(self, pathway_id: str):
+        """Number of distinct UniProt entries taking part in a Reactome pathway, or None if unavailable."""
+        url = f"https://reactome.org/ContentService/data/participants/{pathway_id}/referenceEntities"
+        entities = await self.api_client._get(url)
+        if not isinstance(entities, list):
+            return None
+        proteins = {
+            entity.get("identifier") for entity in entities
+            if isinstance(entity, dict) and entity.get("databaseName") == "UniProt"
+        }
+        proteins.discard(None)
+        return len(proteins) or None
+
 
 class LegacyStringConnector(LegacyDatabaseConnector):
     def __init__(self, api_client: APIClient):
         super().__init__(api_client)
         self.base_url = "https://string-db.org/api/json/network"
 
-    async def get_string_interactions(self, gene_list: list):
+    async def iter_string_interactions(self, gene_list: list):
+        """Yields the interactions of the network response one by one as they are decoded."""
         url = self.base_url
         params = f"identifiers={'%0d'.join(gene_list)}&species=9606"
-        return await self.api_client._get(url, params=params)
+        async for interaction in self.api_client.stream(url, params=params):
+            yield interaction
+
+    async def get_string_interactions(self, gene_list: list):
+        return [interaction async for interaction in self.iter_string_interactions(gene_list)]
 
 
 class LegacyUniProtConnector(LegacyDatabaseConnector):
@@ -0,0 +1,173 @@
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set
+
+# Ontology category -> keywords, matched as substrings of the normalized pathway name
+ONTOLOGY_KEYWORDS = {
+    "Metabolism": ["metabolism", "metabolic"],
+    "Signaling": ["signaling", "signal"],
+    "Cell Cycle": ["cell cycle", "cycle"],
+    "DNA Replication": ["dna replication", "replication"],
+}
+
+# Normalized name -> standardized display name
+PATHWAY_SYNONYMS = {
+    "cell cycle": "Cell Cycle",
+    "metabolism": "Metabolism",
+    "dna replication": "DNA Replication",
+}
+
+# Pathway IDs known to describe the same pathway across databases, mapped to a shared key
+ID_CROSS_REFERENCES = {
+    "hsa04110": "cell cycle", "R-HSA-1640170": "cell cycle",
+    "hsa03030": "dna replication", "R-HSA-69306": "dna replication",
+    "hsa04210": "apoptosis", "R-HSA-109581": "apoptosis",
+    "hsa00010": "glycolysis", "R-HSA-70171": "glycolysis",
+}
+
+# Species suffixes KEGG appends to pathway names, e.g. "Cell cycle - Homo sapiens (human)". The
+# common name in parentheses is required, so two-word name tails ("- beta oxidation") are kept.
+_SPECIES_SUFFIX = re.compile(r"\s+-\s+[a-z]+ [a-z]+ \([^)]*\)$", re.IGNORECASE)
+_SPELLING_VARIANTS = [(re.compile(pattern), replacement) for pattern, replacement in (
+    (r"signall?ing", "signaling"),
+    (r"\bpathways?$", ""),
+    (r"\bvia\b", "by"),
+)]
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_pathway_name(name: str) -> str:
+    """
+    Reduces a pathway display name to a comparison key: lower case, no species suffix,
+    unified spelling, punctuation collapsed to single spaces.
+    """
+    normalized = _SPECIES_SUFFIX.sub("", name.strip().lower())
+    normalized = _NON_ALPHANUMERIC.sub(" ", normalized).strip()
+    for pattern, replacement in _SPELLING_VARIANTS:
+        normalized = pattern.sub(replacement, normalized).strip()
+    return normalized
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton that finds all keywords occurring in a text in a single scan,
+    regardless of how many keywords there are.
+    """
+    def __init__(self, keywords: Dict[str, Iterable[str]]):
+        """
+        :param keywords: label -> keywords that indicate it.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[str]] = [set()]
+
+        for label, words in keywords.items():
+            for word in words:
+                state = 0
+                for char in word:
+                    if char not in self._goto[state]:
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._output.append(set())
+                        self._goto[state][char] = len(self._goto) - 1
+                    state = self._goto[state][char]
+                self._output[state].add(label)
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> Set[str]:
+        """Returns the labels of all keywords found in text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class PathwayNormalizer:
+    """
+    Precompiled pathway name normalization, classification and cross-source matching.
+    Build it once (see get_default_normalizer) and reuse it for every batch.
+    """
+    def __init__(self, ontology_keywords: Dict[str, List[str]] = None,
+                 synonyms: Dict[str, str] = None, id_cross_references: Dict[str, str] = None):
+        self.ontology_keywords = ontology_keywords if ontology_keywords is not None else ONTOLOGY_KEYWORDS
+        self.synonyms = {
+            normalize_pathway_name(name): standard
+            for name, standard in (synonyms if synonyms is not None else PATHWAY_SYNONYMS).items()
+        }
+        self.id_cross_references = id_cross_references if id_cross_references is not None else ID_CROSS_REFERENCES
+        self.automaton = KeywordAutomaton(self.ontology_keywords)
+
+    def standard_name(self, name: str) -> str:
+        """The synonym table's display name if there is one, else the name without species suffix."""
+        return self.synonyms.get(normalize_pathway_name(name)) or _SPECIES_SUFFIX.sub("", name.strip())
+
+    def classify(self, name: str) -> Set[str]:
+        """Returns the ontology categories whose keywords occur in the pathway name."""
+        return self.automaton.find(normalize_pathway_name(name))
+
+    def match_key(self, pathway: Dict) -> str:
+        """The key under which records from different sources are considered the same pathway."""
+        return self.id_cross_references.get(pathway.get("id")) or normalize_pathway_name(pathway["name"])
+
+    def cross_reference(self, pathways: List[Dict]) -> Dict[str, Dict]:
+        """
+        Groups pathway records ({"id", "name", "source"}) from all sources in one pass.
+
+        :return: match key -> {"name", "ids", "names", "sources", "categories", "confidence", "conflicts"}.
+                 confidence is the fraction of the sources in this batch that report the pathway;
+                 conflicts lists machine-readable flags such as "single_source", "name_mismatch"
+                 (matched by ID but named differently) and "multiple_ids" (one source, several IDs).
+        """
+        all_sources = {pathway.get("source") for pathway in pathways}
+        grouped = {}
+        for pathway in pathways:
+            key = self.match_key(pathway)
+            entry = grouped.setdefault(key, {
+                "name": self.standard_name(pathway["name"]),
+                "ids": {},
+                "names": {},
+                "sources": [],
+                "categories": sorted(self.classify(pathway["name"])),
+            })
+            source = pathway.get("source")
+            if source not in entry["sources"]:
+                entry["sources"].append(source)
+            entry["ids"].setdefault(source, set()).add(pathway.get("id"))
+            entry["names"][source] = pathway["name"]
+
+        for entry in grouped.values():
+            conflicts = []
+            if len(entry["sources"]) == 1 and len(all_sources) > 1:
+                conflicts.append("single_source")
+            if len({normalize_pathway_name(name) for name in entry["names"].values()}) > 1:
+                conflicts.append("name_mismatch")
+            if any(len(ids) > 1 for ids in entry["ids"].values()):
+                conflicts.append("multiple_ids")
+            entry["ids"] = {source: sorted(ids, key=str) for source, ids in entry["ids"].items()}
+            entry["confidence"] = len(entry["sources"]) / len(all_sources)
+            entry["conflicts"] = conflicts
+        return grouped
+
+
+@lru_cache(maxsize=1)
+def get_default_normalizer() -> PathwayNormalizer:
+    return PathwayNormalizer()
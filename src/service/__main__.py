@@ -0,0 +1,10 @@
+import argparse
+
+from ..core.config import Config
+from .app import run
+
+parser = argparse.ArgumentParser(description="Run the knowledge graph analysis service.")
+parser.add_argument("--host", default=Config.SERVICE_HOST)
+parser.add_argument("--port", type=int, default=Config.SERVICE_PORT)
+args = parser.parse_args()
+run(args.host, args.port)
@@ -0,0 +1,96 @@
+from aiohttp import web
+
+from ..adapters.llm_adapter import LLMAdapter
+from ..core.config import Config
+from ..utils.streaming import json_dumps
+from .jobs import AnalysisService, Job
+
+SERVICE_KEY = web.AppKey("service", AnalysisService)
+
+
+def _json(data, status: int = 200) -> web.Response:
+    return web.Response(body=json_dumps(data), status=status, content_type="application/json")
+
+
+def _parse_job(body) -> Job:
+    """Validates a POST /jobs body: {"genes": [...], "hops": int, "min_score": float, "llm": bool}."""
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object.")
+    genes = body.get("genes")
+    if not isinstance(genes, list) or not genes or not all(isinstance(gene, str) and gene.strip() for gene in genes):
+        raise ValueError("'genes' must be a non-empty array of gene symbols.")
+    hops = body.get("hops", Config.SERVICE_DEFAULT_HOPS)
+    if not isinstance(hops, int) or isinstance(hops, bool) or hops < 0:
+        raise ValueError("'hops' must be a non-negative integer.")
+    min_score = body.get("min_score")
+    if min_score is not None and (not isinstance(min_score, (int, float)) or isinstance(min_score, bool)):
+        raise ValueError("'min_score' must be a number.")
+    llm = body.get("llm", True)
+    if not isinstance(llm, bool):
+        raise ValueError("'llm' must be true or false.")
+    return Job(genes=list(dict.fromkeys(gene.strip() for gene in genes)), hops=hops,
+               min_score=min_score, llm=llm)
+
+
+async def submit_job(request: web.Request) -> web.Response:
+    try:
+        job = _parse_job(await request.json())
+    except ValueError as e: # includes malformed JSON
+        return _json({"error": str(e)}, status=400)
+    request.app[SERVICE_KEY].submit(job)
+    return _json(job.status_dict(), status=202)
+
+
+async def job_status(request: web.Request) -> web.Response:
+    job = request.app[SERVICE_KEY].get(request.match_info["job_id"])
+    if job is None:
+        return _json({"error": "Unknown job."}, status=404)
+    return _json(job.status_dict())
+
+
+async def job_result(request: web.Request) -> web.Response:
+    job = request.app[SERVICE_KEY].get(request.match_info["job_id"])
+    if job is None:
+        return _json({"error": "Unknown job."}, status=404)
+    if job.status == "failed":
+        return _json(job.status_dict(), status=500)
+    if job.status != "done":
+        # Not ready yet: poll again
+        return _json(job.status_dict(), status=202)
+    return _json({**job.status_dict(), "result": job.result})
+
+
+async def health(request: web.Request) -> web.Response:
+    return _json(request.app[SERVICE_KEY].stats())
+
+
+def create_app(llm_adapter: LLMAdapter = None, **service_options) -> web.Application:
+    """
+    Builds the analysis service application.
+
+    :param llm_adapter: Defaults to an OllamaAdapter.
+    :param service_options: Passed on to AnalysisService (batch_window, max_batch_size, ...).
+    """
+    if llm_adapter is None:
+        from ..adapters.ollama_adapter import OllamaAdapter
+        llm_adapter = OllamaAdapter()
+    service = AnalysisService(llm_adapter, **service_options)
+
+    app = web.Application()
+    app[SERVICE_KEY] = service
+    app.router.add_post("/jobs", submit_job)
+    app.router.add_get("/jobs/{job_id}", job_status)
+    app.router.add_get("/jobs/{job_id}/result", job_result)
+    app.router.add_get("/health", health)
+
+    async def lifecycle(app: web.Application):
+        await service.start()
+        yield
+        await service.stop()
+
+    app.cleanup_ctx.append(lifecycle)
+    return app
+
+
+def run(host: str = Config.SERVICE_HOST, port: int = Config.SERVICE_PORT) -> None:
+    web.run_app(create_app(), host=host, port=port)
@@ -0,0 +1,217 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ..adapters.llm_adapter import LLMAdapter
+from ..core.config import Config
+from ..core.graph_store import count_edges
+from ..core.knowledge_graph import BiologicalKnowledgeGraph
+
+INSIGHTS_QUERY = "Summarize the key findings from the network analysis, including central genes and community structures."
+
+
+@dataclass
+class Job:
+    genes: List[str]
+    hops: int = Config.SERVICE_DEFAULT_HOPS
+    min_score: Optional[float] = None
+    llm: bool = True # Also generate hypotheses and insights
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued" # queued -> running -> done | failed
+    created: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    batch_size: Optional[int] = None # Number of jobs that shared this job's fetch and analysis pass
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    def status_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "genes": self.genes,
+            "created": self.created,
+            "finished": self.finished,
+            "batch_size": self.batch_size,
+            "error": self.error,
+        }
+
+
+class AnalysisService:
+    """
+    Runs analysis jobs against one long-lived knowledge graph, so the API session, caches,
+    the graph built so far and the loaded LLM stay warm between requests.
+
+    Jobs arriving within Config.SERVICE_BATCH_WINDOW of each other are batched: the union of
+    their genes is fetched and reconciled once (genes fetched by earlier batches are skipped,
+    except by STRING), enrichment and propagation run once for all of them, and each job is
+    then analyzed on its own k-hop neighborhood of the shared graph.
+    """
+    def __init__(self, llm_adapter: LLMAdapter, batch_window: float = Config.SERVICE_BATCH_WINDOW,
+                 max_batch_size: int = Config.SERVICE_MAX_BATCH_SIZE,
+                 max_finished_jobs: int = Config.SERVICE_MAX_FINISHED_JOBS):
+        self.bkg = BiologicalKnowledgeGraph(llm_adapter)
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.fetched_genes = set() # Genes every source has answered for without errors
+        self.graph_size = {"nodes": 0, "edges": 0} # Updated by the worker, so /health never touches the store
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if Config.OLLAMA_WARMUP:
+            self.bkg.llm.warmup(background=True)
+        # Held open for the service's lifetime; add_gene_data reuses it
+        await self.bkg.api_client.__aenter__()
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        await self.bkg.api_client.__aexit__(None, None, None)
+
+    def submit(self, job: Job) -> Job:
+        self.jobs[job.job_id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        statuses = [job.status for job in self.jobs.values()]
+        return {
+            **self.graph_size,
+            "fetched_genes": len(self.fetched_genes),
+            "jobs": {status: statuses.count(status) for status in ("queued", "running", "done", "failed")},
+        }
+
+    async def _next_batch(self) -> List[Job]:
+        """Waits for a job, then collects whatever else arrives within the batch window."""
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            for job in batch:
+                job.status = "running"
+                job.batch_size = len(batch)
+            try:
+                await self._build(batch)
+                # Analysis and LLM calls block, so they run off the event loop to keep the endpoints responsive
+                await asyncio.to_thread(self._analyze_batch, batch)
+            except Exception as e:
+                for job in batch:
+                    if job.status == "running":
+                        self._finish(job, error=f"{type(e).__name__}: {e}")
+            self._evict_finished()
+
+    async def _build(self, batch: List[Job]) -> None:
+        """
+        Fetches and reconciles the batch's genes that no earlier batch has fetched.
+
+        KEGG, Reactome and UniProt answer per gene, so they only get the new genes. STRING's
+        network only contains edges among the genes it is sent, so it gets every gene fetched
+        so far plus the new ones; otherwise edges between genes of different batches would be
+        missing, and results would depend on the order jobs arrived in.
+
+        All store mutations happen here, on the event loop; only the LLM call runs in a thread.
+        The analysis thread started afterwards is the only other user of the store, and the two
+        never overlap since the worker awaits one batch at a time.
+        """
+        new_genes = list(dict.fromkeys(gene for job in batch for gene in job.genes if gene not in self.fetched_genes))
+        if not new_genes:
+            return
+        # Sorted, so the same gene set hits the same cached STRING response
+        string_genes = sorted(self.fetched_genes.union(new_genes))
+        database_results = await self.bkg.add_gene_data(new_genes, source_genes={"string": string_genes})
+        reconciled_data = await asyncio.to_thread(self.bkg.reconcile_pathway_data, database_results)
+        if reconciled_data is not None:
+            self.bkg.add_pathway_data(reconciled_data)
+        self.bkg.add_interaction_data(database_results)
+        self.graph_size = {"nodes": self.bkg.store.number_of_nodes(), "edges": self.bkg.store.number_of_edges()}
+
+        # Genes are only final once every source answered cleanly; partial answers (deadline,
+        # open circuit, upstream errors) are fetched again with the next batch that asks for them
+        complete = len(database_results) == len(self.bkg.databases) and not any(
+            result.get("partial") for result in database_results.values()
+        )
+        if complete:
+            self.fetched_genes.update(new_genes)
+
+    def _analyze_batch(self, batch: List[Job]) -> None:
+        bkg = self.bkg
+        if bkg.store.number_of_nodes() == 0:
+            for job in batch:
+                self._finish(job, error="No data was found for the requested genes.")
+            return
+
+        from ..analysis import enrichment
+
+        gene_sets = [job.genes for job in batch]
+        # One vectorized pass each for the whole batch
+        enrichment_results = enrichment.enrich_gene_sets(bkg.store, gene_sets, Config.ENRICHMENT_BACKGROUND_SIZE)
+        propagation_scores = bkg.propagate(gene_sets)
+
+        for i, job in enumerate(batch):
+            try:
+                job.result = self._analyze_job(job, enrichment_results[i], propagation_scores[:, i])
+                self._finish(job)
+            except Exception as e:
+                self._finish(job, error=f"{type(e).__name__}: {e}")
+
+    def _analyze_job(self, job: Job, enrichment_results: List[Dict], propagation_scores) -> Dict[str, Any]:
+        """Runs one job's analysis on its ego subgraph; the shared graph object is used sequentially."""
+        bkg = self.bkg
+        bkg.input_genes = list(job.genes)
+        bkg.enrichment_results = enrichment_results
+        bkg.propagation_scores = propagation_scores
+        bkg.propagation_version = bkg.store.version
+        graph = bkg.extract_ego_subgraph(job.genes, k=job.hops, min_score=job.min_score)
+        if graph.number_of_nodes() == 0:
+            raise ValueError("None of the requested genes are in the graph.")
+
+        bkg.analyze_centrality(use_cache=False, graph=graph)
+        bkg.detect_communities(graph=graph)
+        result = {
+            "nodes": graph.number_of_nodes(),
+            "edges": count_edges(graph), # Interactions once, as in /health
+            "central_nodes": {
+                centrality_type: bkg.get_top_n_central_nodes(centrality_type, n=10)
+                for centrality_type in bkg.centrality_scores
+            },
+            "communities": [sorted(map(str, community_nodes)) for community_nodes in bkg.communities],
+            "enriched_pathways": bkg.get_top_enriched_pathways(),
+            "propagated_genes": bkg.get_top_propagated_genes(),
+        }
+        if job.llm:
+            result["hypotheses"] = bkg.generate_hypotheses("bottleneck genes")
+            result["insights"] = bkg.generate_biological_insights(INSIGHTS_QUERY)
+        return result
+
+    def _finish(self, job: Job, error: str = None) -> None:
+        job.error = error
+        job.status = "failed" if error else "done"
+        job.finished = time.time()
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished is not None]
+        for job_id in finished[:max(len(finished) - self.max_finished_jobs, 0)]:
+            del self.jobs[job_id]
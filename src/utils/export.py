@@ -0,0 +1,158 @@
+import math
+import os
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+import networkx as nx
+
+from ..core.graph_store import UNDIRECTED_RELATIONS, CompactGraphStore, NodeType
+
+# Column name -> "str" | "float" | "int"
+NODE_COLUMNS = {"node_id": "str", "type": "str", "name": "str"}
+EDGE_COLUMNS = {"source": "str", "target": "str", "relation": "str", "weight": "float"}
+COMMUNITY_COLUMNS = {"node_id": "str", "community": "int"}
+CENTRALITY_METRICS = ("degree", "betweenness", "closeness", "eigenvector")
+CENTRALITY_COLUMNS = {"node_id": "str", **{metric: "float" for metric in CENTRALITY_METRICS}}
+
+EXPORT_FORMATS = ("hdf5", "parquet", "arrow")
+
+
+def iter_node_rows(graph: nx.MultiDiGraph) -> Iterator[Tuple]:
+    for node, data in graph.nodes(data=True):
+        yield str(node), data.get("type", ""), data.get("name", "")
+
+
+def iter_edge_rows(graph: nx.MultiDiGraph) -> Iterator[Tuple]:
+    # Views list undirected relations in both directions; export them once, like the store has them
+    undirected = {relation.name.lower() for relation in UNDIRECTED_RELATIONS}
+    seen = set()
+    for u, v, data in graph.edges(data=True):
+        relation = data.get("relation", "")
+        if relation in undirected:
+            if (v, u, relation) in seen:
+                continue
+            seen.add((u, v, relation))
+        yield str(u), str(v), relation, float(data.get("weight", math.nan))
+
+
+def iter_store_node_rows(store: CompactGraphStore) -> Iterator[Tuple]:
+    type_names = {code: code.name.lower() for code in NodeType}
+    for node, code in zip(store.nodes(), store.node_type_codes().tolist()):
+        yield str(node), type_names[code], store.node_name(node) or ""
+
+
+def iter_store_edge_rows(store: CompactGraphStore) -> Iterator[Tuple]:
+    for u, v, relation, weight in store.edges():
+        yield str(u), str(v), relation.name.lower(), math.nan if weight is None else float(weight)
+
+
+def iter_centrality_rows(graph: Union[nx.MultiDiGraph, CompactGraphStore],
+                         centrality_scores: Dict[str, Dict]) -> Iterator[Tuple]:
+    metrics = [centrality_scores.get(metric, {}) for metric in CENTRALITY_METRICS]
+    for node in graph.nodes():
+        yield (str(node),) + tuple(float(scores.get(node, math.nan)) for scores in metrics)
+
+
+def iter_community_rows(communities: List) -> Iterator[Tuple]:
+    for community_id, community_nodes in enumerate(communities):
+        for node in community_nodes:
+            yield str(node), community_id
+
+
+def result_tables(graph: nx.MultiDiGraph, centrality_scores: Dict[str, Dict],
+                  communities: List) -> Dict[str, Tuple[Dict[str, str], Iterator[Tuple]]]:
+    """Returns the exported tables as {table name: (column types, row iterator)}."""
+    return {
+        "nodes": (NODE_COLUMNS, iter_node_rows(graph)),
+        "edges": (EDGE_COLUMNS, iter_edge_rows(graph)),
+        "centrality": (CENTRALITY_COLUMNS, iter_centrality_rows(graph, centrality_scores)),
+        "communities": (COMMUNITY_COLUMNS, iter_community_rows(communities)),
+    }
+
+
+def store_result_tables(store: CompactGraphStore, centrality_scores: Dict[str, Dict],
+                        communities: List) -> Dict[str, Tuple[Dict[str, str], Iterator[Tuple]]]:
+    """Same tables as result_tables for the whole graph, read from the store without a networkx view."""
+    return {
+        "nodes": (NODE_COLUMNS, iter_store_node_rows(store)),
+        "edges": (EDGE_COLUMNS, iter_store_edge_rows(store)),
+        "centrality": (CENTRALITY_COLUMNS, iter_centrality_rows(store, centrality_scores)),
+        "communities": (COMMUNITY_COLUMNS, iter_community_rows(communities)),
+    }
+
+
+def iter_column_chunks(rows: Iterable[Tuple], columns: Dict[str, str], chunk_size: int) -> Iterator[Dict[str, list]]:
+    """Groups rows into column-oriented chunks of at most chunk_size rows."""
+    names = list(columns)
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield {name: list(values) for name, values in zip(names, zip(*chunk))}
+
+
+def export_tables(tables: Dict[str, Tuple[Dict[str, str], Iterator[Tuple]]], path: str,
+                  export_format: str = "hdf5", chunk_size: int = 100_000) -> List[str]:
+    """
+    Writes tables in streaming chunks, so no table is ever fully materialized in memory.
+
+    hdf5    -> one file at path, a group per table and a chunked, gzip-compressed dataset per column
+    parquet -> a directory at path with <table>.parquet files, one row group per chunk
+    arrow   -> a directory at path with <table>.arrow IPC files, memory-mappable with pyarrow
+
+    :return: The paths written.
+    """
+    if export_format == "hdf5":
+        _write_hdf5(tables, path, chunk_size)
+        return [path]
+    if export_format in ("parquet", "arrow"):
+        os.makedirs(path, exist_ok=True)
+        written = []
+        for name, (columns, rows) in tables.items():
+            table_path = os.path.join(path, f"{name}.{export_format}")
+            _write_arrow(columns, rows, table_path, export_format, chunk_size)
+            written.append(table_path)
+        return written
+    raise ValueError(f"Unknown export format '{export_format}'. Expected one of {EXPORT_FORMATS}.")
+
+
+def _write_hdf5(tables, path: str, chunk_size: int) -> None:
+    import h5py
+    import numpy as np
+
+    dtypes = {"str": h5py.string_dtype(), "float": np.float64, "int": np.int64}
+    with h5py.File(path, "w") as f:
+        for name, (columns, rows) in tables.items():
+            group = f.create_group(name)
+            datasets = {
+                column: group.create_dataset(column, shape=(0,), maxshape=(None,), dtype=dtypes[kind],
+                                             chunks=(max(1, min(chunk_size, 65536)),), compression="gzip")
+                for column, kind in columns.items()
+            }
+            for chunk in iter_column_chunks(rows, columns, chunk_size):
+                for column, values in chunk.items():
+                    dataset = datasets[column]
+                    start = dataset.shape[0]
+                    dataset.resize((start + len(values),))
+                    dataset[start:] = values
+            group.attrs["columns"] = list(columns)
+
+
+def _write_arrow(columns: Dict[str, str], rows, path: str, export_format: str, chunk_size: int) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet/Arrow export requires pyarrow (pip install pyarrow); "
+                          "use export_format='hdf5' otherwise.") from e
+
+    types = {"str": pa.string(), "float": pa.float64(), "int": pa.int64()}
+    schema = pa.schema([(column, types[kind]) for column, kind in columns.items()])
+    # Each chunk becomes its own Parquet row group / Arrow record batch
+    writer = pq.ParquetWriter(path, schema) if export_format == "parquet" else pa.ipc.new_file(path, schema)
+    try:
+        for chunk in iter_column_chunks(rows, columns, chunk_size):
+            writer.write_table(pa.Table.from_pydict(chunk, schema=schema))
+    finally:
+        writer.close()
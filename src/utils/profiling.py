@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure_import_time(module: str, runs: int = 3, top_n: int = 5) -> Dict:
+    """
+    Imports module in fresh interpreters and reports how long startup takes.
+
+    :param module: Dotted module name, e.g. "src.core.knowledge_graph".
+    :param runs: Number of fresh interpreters to start; the fastest run is reported.
+    :param top_n: Number of slowest direct imports of module to list.
+    :return: {"module", "wall_seconds", "import_seconds", "slowest_imports": [(name, seconds)]}
+    """
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        wall = time.perf_counter() - start
+        if best is None or wall < best[0]:
+            best = (wall, completed.stderr)
+
+    wall, report = best
+    # The module and the packages containing it; interpreter startup (site, encodings, ...)
+    # is reported as separate top-level entries and left out
+    parts = module.split(".")
+    measured = {".".join(parts[:i]) for i in range(1, len(parts) + 1)}
+    import_seconds = 0.0
+    direct_imports = []
+    for name, seconds, children in _top_level_imports(_parse_importtime(report)):
+        if name in measured:
+            import_seconds += seconds
+            direct_imports.extend(
+                (child, child_seconds) for child, child_seconds, depth in children
+                if depth == 1 and child not in measured
+            )
+    return {
+        "module": module,
+        "wall_seconds": wall,
+        "import_seconds": import_seconds,
+        "slowest_imports": sorted(direct_imports, key=lambda item: item[1], reverse=True)[:top_n],
+    }
+
+
+def _top_level_imports(entries: List[tuple]) -> List[tuple]:
+    """
+    Groups parsed entries under their top-level import. -X importtime lists an import after
+    everything it imported, so each depth-0 entry closes the group of entries before it.
+
+    :return: (module, cumulative seconds, nested entries) per top-level import.
+    """
+    groups = []
+    children = []
+    for name, seconds, depth in entries:
+        if depth == 0:
+            groups.append((name, seconds, children))
+            children = []
+        else:
+            children.append((name, seconds, depth))
+    return groups
+
+
+def _parse_importtime(report: str) -> List[tuple]:
+    """Returns (module, cumulative seconds, nesting depth) for each entry of a -X importtime report."""
+    entries = []
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue # Header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), int(cumulative) / 1e6, depth))
+    return entries
@@ -0,0 +1,74 @@
+import random
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Returns a "full jitter" exponential backoff delay for the given retry attempt (0-based).
+    Spreading retries randomly over [0, min(cap, base * 2**attempt)] avoids synchronized retry storms.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Tracks consecutive failures of one upstream source.
+
+    closed    -> requests flow normally
+    open      -> the source is skipped until reset_timeout has passed
+    half-open -> a single probe request is let through; success closes, failure re-opens
+    """
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None # Set while the half-open probe is in flight
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+        # Half-open: admit one probe. A probe that never reported back (e.g. was cancelled)
+        # is given up on after another reset_timeout.
+        now = time.monotonic()
+        if self.probe_started is not None and now - self.probe_started < self.reset_timeout:
+            return False
+        self.probe_started = now
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probe_started = None
+        if self.state == "half-open" or self.failures >= self.failure_threshold:
+            # (Re-)open the breaker; a failed probe restarts the reset window.
+            self.opened_at = time.monotonic()
+
+
+# Errors swallowed by APIClient._get are appended to the list held here (if any), so the
+# caller that owns a source fetch can tell a clean empty answer from a degraded one.
+request_errors: ContextVar[Optional[list]] = ContextVar("request_errors", default=None)
+
+
+def record_request_error(error: str) -> None:
+    errors = request_errors.get()
+    if errors is not None:
+        errors.append(error)
@@ -0,0 +1,202 @@
+import codecs
+import json
+import re
+from typing import Any, List
+
+try: # Optional fast JSON backend
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data: bytes) -> Any:
+    """Decodes a complete JSON document, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serializes obj to compact UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = ",] \t\n\r"
+
+
+class JSONStreamDecoder:
+    """
+    Incrementally decodes a JSON body fed in byte chunks.
+
+    If the top-level value is an array, its elements are returned from feed() as soon as
+    they are complete, so the raw text never has to be held in memory at once. Any other
+    top-level value is buffered and decoded in one go by close().
+    """
+    def __init__(self):
+        self.is_array = None # Unknown until the first non-whitespace byte arrives
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._scanner = json.JSONDecoder()
+        self._document = [] # Raw chunks of a non-array body
+        self._buffer = ""
+        self._expect_separator = False
+        self._expect_element = False # Right after a ',', where ']' is not allowed
+        self._finished = False
+        self._retry_at = 0 # Buffer length at which an incomplete element is worth re-scanning
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        if self.is_array is None:
+            stripped = chunk.lstrip()
+            if not stripped:
+                return []
+            self.is_array = stripped[:1] == b"["
+            if self.is_array:
+                chunk = stripped[1:]
+
+        if not self.is_array:
+            self._document.append(chunk)
+            return []
+
+        self._buffer += self._text_decoder.decode(chunk)
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        if not self.is_array:
+            return [json_loads(b"".join(self._document))]
+
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        items = self._drain(final=True)
+        if not self._finished:
+            raise ValueError("Truncated JSON array in response body")
+        return items
+
+    def _drain(self, final: bool) -> List[Any]:
+        if not final and len(self._buffer) < self._retry_at:
+            return []
+
+        items = []
+        buf = self._buffer
+        pos = 0
+        while not self._finished:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                if self._expect_element:
+                    raise ValueError("Trailing ',' in JSON array")
+                self._finished = True
+                pos += 1
+                break
+            if self._expect_separator:
+                if buf[pos] != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {buf[pos]!r}")
+                self._expect_separator = False
+                self._expect_element = True
+                pos += 1
+                continue
+            if buf[pos] == ",":
+                raise ValueError("Expected a value in JSON array, got ','")
+
+            try:
+                item, end = self._scanner.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                # Element not complete yet; wait until the buffer has doubled before
+                # re-scanning it so a single huge element stays linear to decode.
+                self._retry_at = 2 * (len(buf) - pos)
+                break
+            if not final and not isinstance(item, (dict, list, str)) and (end == len(buf) or buf[end] not in _DELIMITERS):
+                # A number cut at the chunk boundary ("1." + "5", "1e" + "-3") may still continue;
+                # scalars are only taken once a delimiter follows them.
+                break
+            items.append(item)
+            self._expect_separator = True
+            self._expect_element = False
+            self._retry_at = 0
+            pos = end
+
+        if self._finished:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf):
+                raise ValueError(f"Unexpected data after JSON array: {buf[pos:pos + 20]!r}")
+        self._buffer = buf[pos:]
+        return items
+
+
+class XMLStreamDecoder:
+    """
+    Incrementally parses an XML body fed in byte chunks (the push-based form of lxml.iterparse).
+
+    With tag=None the whole tree is built and close() returns its root. With a tag, feed()
+    returns each matching element once it is complete and clears it afterwards, so arbitrarily
+    large documents are processed in bounded memory.
+    """
+    def __init__(self, tag: str = None):
+        from lxml import etree
+        self.tag = tag
+        self.is_array = tag is not None
+        self._parser = etree.XMLPullParser(events=("end",), tag=tag) if tag else etree.XMLPullParser()
+        self._emitted = []
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self._parser.feed(chunk)
+        return self._collect()
+
+    def close(self) -> List[Any]:
+        root = self._parser.close()
+        if self.tag is None:
+            return [root]
+        # Nothing is parsed after this, so the elements feed() returned last are left intact
+        # (decode_body hands them out together with these).
+        return self._collect(clear=False)
+
+    def _collect(self, clear: bool = True) -> List[Any]:
+        if self.tag is None:
+            return []
+        # Elements handed out last time have been consumed by now; free them.
+        for element in self._emitted if clear else ():
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        self._emitted = [element for _, element in self._parser.read_events()]
+        return list(self._emitted)
+
+
+class TextStreamDecoder:
+    """Collects a text (or raw bytes) body fed in chunks."""
+    def __init__(self, binary: bool = False):
+        self.is_array = False
+        self.binary = binary
+        self._chunks = []
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self._chunks.append(chunk)
+        return []
+
+    def close(self) -> List[Any]:
+        body = b"".join(self._chunks)
+        return [body if self.binary else body.decode("utf-8")]
+
+
+def decode_body(body: bytes, response_format: str, tag: str = None) -> Any:
+    """
+    Decodes a complete body. JSON goes through json_loads (orjson when installed), which is
+    faster than incremental decoding when the whole value is needed anyway.
+    """
+    if response_format == "json":
+        return json_loads(body)
+    decoder = make_decoder(response_format, tag)
+    items = decoder.feed(body) + decoder.close()
+    return items if decoder.is_array else items[0]
+
+
+def make_decoder(response_format: str, tag: str = None):
+    """Returns a fresh streaming decoder for the given APIClient response format."""
+    if response_format == "json":
+        return JSONStreamDecoder()
+    if response_format == "xml":
+        return XMLStreamDecoder(tag)
+    return TextStreamDecoder(binary=response_format != "text")